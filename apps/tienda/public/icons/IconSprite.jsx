@@ -0,0 +1,54 @@
+// Auto-generated from catsandsubsEP-v1.0 by extract_icons_fixed.py --sprite
+// Every icon lives as a <symbol> in /icons/ep-sprite.svg; the browser downloads and
+// caches the sprite once and each icon is a <use> reference.
+
+export const ICON_SPRITE_URL = '/icons/ep-sprite.svg';
+
+export const ICON_NAMES = [
+  'toys',
+  'women-accessories',
+  'boys-footwear',
+  'food-processor',
+  'high-chairs',
+  'breastfeeding',
+  'walker',
+  'cribs',
+  'wheels',
+  'strollers',
+  'girl',
+  'car-seat',
+  'rocking-chair',
+  'books',
+  'crib-accessories',
+  'safety',
+  'women-clothing',
+  'ride-on',
+  'other-travel',
+  'boy',
+  'girls-footwear',
+  'bathroom',
+  'costume',
+  'large-toys',
+  'train',
+  'stroller-main',
+  'cradle-main',
+  'food-main',
+  'bath-main',
+  'dress-main'
+];
+
+export const EpIcon = ({ name, className = "", size = 24, color = "currentColor", title }) => (
+  <svg
+    width={size}
+    height={size}
+    className={className}
+    fill={color}
+    role={title ? "img" : undefined}
+    aria-hidden={title ? undefined : true}
+  >
+    {title && <title>{title}</title>}
+    <use href={`${ICON_SPRITE_URL}#ep-${name}`} />
+  </svg>
+);
+
+export default EpIcon;
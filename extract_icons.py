@@ -1,91 +1,46 @@
 #!/usr/bin/env python3
-import json
-import xml.etree.ElementTree as ET
-import os
+import argparse
 from pathlib import Path
 
-def extract_svg_icons():
-    # Read the selection.json file
-    with open('catsandsubsEP-v1.0/selection.json', 'r') as f:
-        data = json.load(f)
-    
-    # Parse the SVG font file
-    tree = ET.parse('catsandsubsEP-v1.0/fonts/catsandsubsEP.svg')
-    root = tree.getroot()
-    
-    # Find all glyphs in the SVG font
-    ns = {'svg': 'http://www.w3.org/2000/svg'}
-    glyphs = {}
-    
-    for glyph in root.findall('.//glyph'):
-        unicode_val = glyph.get('unicode')
-        if unicode_val:
-            # Get the path data
-            d = glyph.get('d')
-            if d:
-                glyphs[ord(unicode_val)] = d
+from icon_library import FONT_FILE, ICON_MAPPING, library
+from icon_manifest import HashedOutput, content_hash, write_if_changed
+
+# Incremental mode: bump when the generated markup changes so hashes change too
+SVG_TEMPLATE = 'svg-font-1024-v1'
+
+def extract_svg_icons(incremental=False):
+    # Glyphs of the SVG font, already flipped into the 1024 box of selection.json
+    glyphs = library('font')
     
     # Create output directory
     output_dir = Path('apps/tienda/public/icons')
     output_dir.mkdir(parents=True, exist_ok=True)
     
-    # Map of icon names to their usage in the app
-    icon_mapping = {
-        'juguetes': 'toys',
-        'accesorios-dama': 'women-accessories',
-        'calzado-nino': 'boys-footwear',
-        'calzado-nina': 'girls-footwear',
-        'procesador-alimentos': 'food-processor',
-        'sillas-comer': 'high-chairs',
-        'lactancia': 'breastfeeding',
-        'andadera': 'walker',
-        'cunas': 'cribs',
-        'sobre-ruedas': 'wheels',
-        'carriolas': 'strollers',
-        'nina': 'girl',
-        'nino': 'boy',
-        'autoasiento': 'car-seat',
-        'mecedora': 'rocking-chair',
-        'libros': 'books',
-        'accesorios-cunas': 'crib-accessories',
-        'seguridad': 'safety',
-        'ropa-dama': 'women-clothing',
-        'correpasillos': 'ride-on',
-        'otros-paseo': 'other-travel',
-        'bano': 'bathroom',
-        'disfraz': 'costume',
-        'juegos-grandes': 'large-toys',
-        'TRAINTHIN': 'train',
-        'Stroller-EP': 'stroller-ep',
-        'Cradle-EP': 'cradle-ep',
-        'Food-EP': 'food-ep',
-        'Bath-EP': 'bath-ep',
-        'Dress-EP': 'dress-ep'
-    }
-    
+    # Incremental: content-hashed file names + manifest, unchanged icons skipped
+    hashed = (HashedOutput(output_dir, 'catsandsubsEP.svg', FONT_FILE)
+              if incremental else None)
+
     # Extract each icon
     extracted_count = 0
-    for icon in data['icons']:
-        props = icon['properties']
-        name = props['name']
-        code = props.get('code', 0)
+    svg_files = {}
+    for glyph in glyphs:
+        name = glyph.name
+        english_name = glyph.english_name
+        svg_content = glyph.svg()
         
-        if code in glyphs:
-            # Get the English name or use original
-            english_name = icon_mapping.get(name, name.lower().replace(' ', '-'))
-            
-            # Create individual SVG file
-            svg_content = f'''<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 512 512">
-  <path d="{glyphs[code]}" fill="currentColor" transform="scale(1, -1) translate(0, -512)"/>
-</svg>'''
-            
-            # Save the SVG file
-            svg_filename = output_dir / f"ep-{english_name}.svg"
-            with open(svg_filename, 'w') as f:
+        # Save the SVG file
+        if hashed:
+            digest = content_hash(SVG_TEMPLATE, *glyph.paths)
+            svg_file = hashed.write(english_name, f"ep-{english_name}", digest,
+                                    lambda: svg_content, original=name)
+        else:
+            svg_file = f"ep-{english_name}.svg"
+            with open(output_dir / svg_file, 'w') as f:
                 f.write(svg_content)
-            
-            extracted_count += 1
-            print(f"Extracted: ep-{english_name}.svg (original: {name})")
+        
+        svg_files[english_name] = svg_file
+        extracted_count += 1
+        print(f"Extracted: {svg_file} (original: {name})")
     
     print(f"\n✅ Successfully extracted {extracted_count} icons to {output_dir}")
     
@@ -94,13 +49,23 @@ def extract_svg_icons():
     index_content += "| Original Name | English Name | File | Usage |\n"
     index_content += "|---------------|--------------|------|-------|\n"
     
-    for name, english in icon_mapping.items():
-        index_content += f"| {name} | {english} | ep-{english}.svg | `<img src='/icons/ep-{english}.svg' />` |\n"
+    for name, english in ICON_MAPPING.items():
+        # Incremental names carry the content hash (ep-<name>.<hash>.svg)
+        svg_file = svg_files.get(english, f"ep-{english}.svg")
+        index_content += f"| {name} | {english} | {svg_file} | `<img src='/icons/{svg_file}' />` |\n"
     
-    with open(output_dir / 'ICONS_INDEX.md', 'w') as f:
-        f.write(index_content)
+    if hashed:
+        write_if_changed(output_dir / 'ICONS_INDEX.md', index_content)
+        hashed.finish()
+    else:
+        with open(output_dir / 'ICONS_INDEX.md', 'w') as f:
+            f.write(index_content)
     
     print(f"📝 Created icon index at {output_dir}/ICONS_INDEX.md")
 
 if __name__ == "__main__":
-    extract_svg_icons()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Extract the Entrepeques icon font glyphs as SVG")
+    parser.add_argument('--incremental', action='store_true',
+                        help="content-hashed file names + icons-manifest.json; skip unchanged icons")
+    args = parser.parse_args()
+    extract_svg_icons(args.incremental)
\ No newline at end of file
@@ -1,87 +1,57 @@
 #!/usr/bin/env python3
-import json
-import os
+import argparse
 from pathlib import Path
 
-def extract_svg_icons():
-    # Read the selection.json file
-    with open('catsandsubsEP-v1.0/selection.json', 'r', encoding='utf-8') as f:
-        data = json.load(f)
+from icon_library import DEFAULT_PRECISION, ICON_MAPPING, SELECTION_FILE, VIEWBOX, library, minify_path
+from icon_manifest import HashedOutput, content_hash, write_if_changed
+
+# Sprite mode: one SVG with a <symbol> per icon, referenced with <use>
+SPRITE_FILE = 'ep-sprite.svg'
+SPRITE_COMPONENT_FILE = 'IconSprite.jsx'
+
+# Incremental mode: bump when the generated markup changes so hashes change too
+SVG_TEMPLATE = 'svg-1024-v1'
+SPRITE_TEMPLATE = 'sprite-v1'
+SOURCE = SELECTION_FILE
+
+def extract_svg_icons(incremental=False):
+    icons = library('selection')
     
     # Create output directory
     output_dir = Path('apps/tienda/public/icons')
     output_dir.mkdir(parents=True, exist_ok=True)
     
-    # Map of icon names to their usage in the app
-    icon_mapping = {
-        'juguetes': 'toys',
-        'accesorios-dama': 'women-accessories',
-        'calzado-nino': 'boys-footwear',
-        'calzado-nina': 'girls-footwear',
-        'procesador-alimentos': 'food-processor',
-        'sillas-comer': 'high-chairs',
-        'lactancia': 'breastfeeding',
-        'andadera': 'walker',
-        'cunas': 'cribs',
-        'sobre-ruedas': 'wheels',
-        'carriolas': 'strollers',
-        'nina': 'girl',
-        'nino': 'boy',
-        'autoasiento': 'car-seat',
-        'mecedora': 'rocking-chair',
-        'libros': 'books',
-        'accesorios-cunas': 'crib-accessories',
-        'seguridad': 'safety',
-        'ropa-dama': 'women-clothing',
-        'correpasillos': 'ride-on',
-        'otros-paseo': 'other-travel',
-        'bano': 'bathroom',
-        'disfraz': 'costume',
-        'juegos-grandes': 'large-toys',
-        'TRAINTHIN': 'train',
-        'Stroller-EP': 'stroller-main',
-        'Cradle-EP': 'cradle-main',
-        'Food-EP': 'food-main',
-        'Bath-EP': 'bath-main',
-        'Dress-EP': 'dress-main'
-    }
-    
+    # Incremental: content-hashed file names + manifest, unchanged icons skipped
+    hashed = HashedOutput(output_dir, 'selection.json', SOURCE) if incremental else None
+
     # Extract each icon
     extracted_count = 0
+    svg_files = {}
     icon_components = []
     
-    for icon in data['icons']:
-        props = icon['properties']
-        name = props['name']
-        code = props.get('code', 0)
+    for icon in icons:
+        name = icon.name
+        paths = icon.paths
+        english_name = icon.english_name
+        svg_content = icon.svg()
         
-        # Get the paths from the icon data - correct structure
-        if 'icon' in icon and 'paths' in icon['icon']:
-            paths = icon['icon']['paths']
-            
-            # Get the English name or use original
-            english_name = icon_mapping.get(name, name.lower().replace(' ', '-'))
-            
-            # Create SVG content from paths
-            svg_paths = []
-            for path in paths:
-                svg_paths.append(f'  <path d="{path}" fill="currentColor"/>')
-            
-            svg_content = f'''<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 1024 1024" width="24" height="24">
-{chr(10).join(svg_paths)}
-</svg>'''
-            
-            # Save the SVG file
-            svg_filename = output_dir / f"ep-{english_name}.svg"
-            with open(svg_filename, 'w', encoding='utf-8') as f:
+        # Save the SVG file
+        if hashed:
+            digest = content_hash(SVG_TEMPLATE, *paths)
+            svg_file = hashed.write(english_name, f"ep-{english_name}", digest,
+                                    lambda: svg_content, original=name)
+        else:
+            svg_file = f"ep-{english_name}.svg"
+            with open(output_dir / svg_file, 'w', encoding='utf-8') as f:
                 f.write(svg_content)
-            
-            extracted_count += 1
-            print(f"Extracted: ep-{english_name}.svg (original: {name})")
-            
-            # Create React component for the icon
-            component_name = english_name.replace('-', '_').title().replace('_', '')
-            component = f'''// Icon: {name} -> {english_name}
+        
+        svg_files[english_name] = svg_file
+        extracted_count += 1
+        print(f"Extracted: {svg_file} (original: {name})")
+        
+        # Create React component for the icon
+        component_name = english_name.replace('-', '_').title().replace('_', '')
+        component = f'''// Icon: {name} -> {english_name}
 export const Icon{component_name} = ({{ className = "", size = 24, color = "currentColor" }}) => (
   <svg 
     xmlns="http://www.w3.org/2000/svg" 
@@ -94,7 +64,7 @@ export const Icon{component_name} = ({{ className = "", size = 24, color = "curr
   </svg>
 );
 '''
-            icon_components.append(component)
+        icon_components.append(component)
     
     # Create a React components file with all icons
     react_content = '''// Auto-generated icon components from Entrepeques icon font
@@ -103,8 +73,11 @@ export const Icon{component_name} = ({{ className = "", size = 24, color = "curr
 ''' + '\n\n'.join(icon_components)
     
     react_file = output_dir / 'IconComponents.jsx'
-    with open(react_file, 'w', encoding='utf-8') as f:
-        f.write(react_content)
+    if hashed:
+        write_if_changed(react_file, react_content)
+    else:
+        with open(react_file, 'w', encoding='utf-8') as f:
+            f.write(react_content)
     
     print(f"\n✅ Successfully extracted {extracted_count} icons to {output_dir}")
     print(f"📝 Created React components at {output_dir}/IconComponents.jsx")
@@ -114,14 +87,156 @@ export const Icon{component_name} = ({{ className = "", size = 24, color = "curr
     index_content += "| Original Name | English Name | File | Usage in Astro/HTML | Usage in React |\n"
     index_content += "|---------------|--------------|------|---------------------|----------------|\n"
     
-    for name, english in icon_mapping.items():
+    for name, english in ICON_MAPPING.items():
+        # Incremental names carry the content hash (ep-<name>.<hash>.svg)
+        svg_file = svg_files.get(english, f"ep-{english}.svg")
         component_name = f"Icon{english.replace('-', '').title()}"
-        index_content += f"| {name} | {english} | ep-{english}.svg | `<img src='/icons/ep-{english}.svg' />` | `<{component_name} />` |\n"
+        index_content += f"| {name} | {english} | {svg_file} | `<img src='/icons/{svg_file}' />` | `<{component_name} />` |\n"
     
-    with open(output_dir / 'ICONS_INDEX.md', 'w', encoding='utf-8') as f:
-        f.write(index_content)
+    if hashed:
+        write_if_changed(output_dir / 'ICONS_INDEX.md', index_content)
+        hashed.finish()
+    else:
+        with open(output_dir / 'ICONS_INDEX.md', 'w', encoding='utf-8') as f:
+            f.write(index_content)
     
     print(f"📋 Created icon index at {output_dir}/ICONS_INDEX.md")
 
+def build_sprite(icons, precision=DEFAULT_PRECISION):
+    """Build the sprite SVG and collect per-icon byte sizes.
+
+    Returns (sprite_text, sizes) where sizes is a list of
+    (english_name, original_name, standalone_bytes, symbol_bytes).
+    """
+    symbols = []
+    sizes = []
+    for icon in icons:
+        # Same markup the per-icon mode writes, to compare against
+        standalone = icon.svg()
+        # One <path> per original path: merging them could change the
+        # nonzero fill where paths overlap
+        body = ''.join(f'<path d="{minify_path(path, precision)}"/>' for path in icon.paths)
+        symbol = f'<symbol id="ep-{icon.english_name}" viewBox="{VIEWBOX}">{body}</symbol>'
+
+        symbols.append(symbol)
+        sizes.append((icon.english_name, icon.name, len(standalone.encode('utf-8')),
+                      len(symbol.encode('utf-8'))))
+
+    sprite = ('<svg xmlns="http://www.w3.org/2000/svg">\n'
+              + '\n'.join(symbols) + '\n</svg>\n')
+    return sprite, sizes
+
+
+def sprite_component(icons, sprite_url):
+    """React component that draws any icon from the sprite by name."""
+    names = ',\n'.join(f"  '{english_name}'" for english_name, *_ in icons)
+    return f'''// Auto-generated from catsandsubsEP-v1.0 by extract_icons_fixed.py --sprite
+// Every icon lives as a <symbol> in {sprite_url}; the browser downloads and
+// caches the sprite once and each icon is a <use> reference.
+
+export const ICON_SPRITE_URL = '{sprite_url}';
+
+export const ICON_NAMES = [
+{names}
+];
+
+export const EpIcon = ({{ name, className = "", size = 24, color = "currentColor", title }}) => (
+  <svg
+    width={{size}}
+    height={{size}}
+    className={{className}}
+    fill={{color}}
+    role={{title ? "img" : undefined}}
+    aria-hidden={{title ? undefined : true}}
+  >
+    {{title && <title>{{title}}</title>}}
+    <use href={{`${{ICON_SPRITE_URL}}#ep-${{name}}`}} />
+  </svg>
+);
+
+export default EpIcon;
+'''
+
+
+def print_size_report(icons, sprite_bytes):
+    """Print standalone SVG bytes vs bytes inside the sprite, per icon and total."""
+    print(f"\n📊 Size report ({len(icons)} icons)")
+    print(f"{'Icon':24} {'SVG file':>10} {'In sprite':>10} {'Saved':>7}")
+    for english_name, _, standalone, symbol in icons:
+        saved = 100 * (1 - symbol / standalone)
+        print(f"{english_name:24} {standalone:10,} {symbol:10,} {saved:6.1f}%")
+
+    total = sum(standalone for _, _, standalone, _ in icons)
+    print(f"{'TOTAL':24} {total:10,} {sprite_bytes:10,} {100 * (1 - sprite_bytes / total):6.1f}%")
+    print(f"   {len(icons)} requests -> 1 request, {total - sprite_bytes:,} bytes saved")
+
+
+def sprite_hash(icons, precision):
+    """Hash of everything that ends up in the sprite."""
+    parts = [SPRITE_TEMPLATE, str(precision)]
+    for icon in icons:
+        parts.append(ICON_MAPPING.get(icon.name, icon.name))
+        parts.extend(icon.paths)
+    return content_hash(*parts)
+
+
+def extract_sprite(precision=DEFAULT_PRECISION, incremental=False):
+    """Sprite mode: ep-sprite.svg + IconSprite.jsx with minified path data.
+
+    With incremental the sprite is written as ep-sprite.<hash>.svg (and only
+    rebuilt when an icon or the precision changed).
+    """
+    icons = library('selection')
+
+    output_dir = Path('apps/tienda/public/icons')
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    built = {}
+
+    def render():
+        built['sprite'], built['icons'] = build_sprite(icons, precision)
+        return built['sprite']
+
+    if incremental:
+        hashed = HashedOutput(output_dir, 'selection.json', SOURCE)
+        sprite_file = hashed.write('sprite', SPRITE_FILE[:-len('.svg')], sprite_hash(icons, precision),
+                                   render, section='sprite', precision=precision)
+    else:
+        sprite_file = SPRITE_FILE
+        with open(output_dir / sprite_file, 'w', encoding='utf-8') as f:
+            f.write(render())
+    print(f"🧩 Sprite at {output_dir}/{sprite_file}")
+
+    # Unchanged sprite: the component only needs the names
+    sizes = built.get('icons') or [(icon.english_name,) for icon in icons]
+
+    component = sprite_component(sizes, f'/icons/{sprite_file}')
+    if incremental:
+        write_if_changed(output_dir / SPRITE_COMPONENT_FILE, component)
+        hashed.finish()
+    else:
+        with open(output_dir / SPRITE_COMPONENT_FILE, 'w', encoding='utf-8') as f:
+            f.write(component)
+    print(f"📝 Sprite component at {output_dir}/{SPRITE_COMPONENT_FILE}")
+
+    if 'sprite' in built:
+        print_size_report(built['icons'], len(built['sprite'].encode('utf-8')))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extract the Entrepeques icon font as SVG")
+    parser.add_argument('--sprite', action='store_true',
+                        help=f"write a single {SPRITE_FILE} + {SPRITE_COMPONENT_FILE} instead of one file per icon")
+    parser.add_argument('--precision', type=int, default=DEFAULT_PRECISION,
+                        help="decimals kept in sprite path data (default %(default)s)")
+    parser.add_argument('--incremental', action='store_true',
+                        help="content-hashed file names + icons-manifest.json; skip unchanged icons")
+    args = parser.parse_args()
+
+    if args.sprite:
+        extract_sprite(args.precision, args.incremental)
+    else:
+        extract_svg_icons(args.incremental)
+
 if __name__ == "__main__":
-    extract_svg_icons()
\ No newline at end of file
+    main()
\ No newline at end of file
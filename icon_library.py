@@ -0,0 +1,450 @@
+#!/usr/bin/env python3
+"""Entrepeques icon library: the catsandsubsEP icons from either source.
+
+Two sources describe the same 30 icons:
+- selection.json (IcoMoon project): one or more paths per icon, SVG
+  coordinates in a 1024x1024 box, y pointing down
+- fonts/catsandsubsEP.svg (SVG font): one <glyph> per icon, font units
+  with y pointing up from the baseline
+
+Each source is loaded lazily, on first use, and indexed in one pass by
+original name, English name and code point. Glyphs are flipped into the
+selection.json coordinate system so icons from both sources render the
+same way. get_icon() falls back to the font for icons missing from
+selection.json. cross_check() verifies that both sources agree.
+
+    from icon_library import get_icon, library
+    svg = get_icon('toys', 48)          # memoized SVG markup
+    for icon in library():              # selection.json icons
+        print(icon.english_name, icon.code)
+
+    python icon_library.py check        # compare both sources
+    python icon_library.py show toys --size 48
+"""
+import argparse
+import functools
+import json
+import re
+import sys
+import xml.etree.ElementTree as ET
+
+SELECTION_FILE = 'catsandsubsEP-v1.0/selection.json'
+FONT_FILE = 'catsandsubsEP-v1.0/fonts/catsandsubsEP.svg'
+SVG_NS = '{http://www.w3.org/2000/svg}'
+GRID = 1024  # selection.json viewBox and font units-per-em
+VIEWBOX = f'0 0 {GRID} {GRID}'
+# Decimals kept in minified path data (the grid is 1024 units, icons render at ~24px)
+DEFAULT_PRECISION = 1
+
+# Map of icon names to their usage in the app
+ICON_MAPPING = {
+    'juguetes': 'toys',
+    'accesorios-dama': 'women-accessories',
+    'calzado-nino': 'boys-footwear',
+    'calzado-nina': 'girls-footwear',
+    'procesador-alimentos': 'food-processor',
+    'sillas-comer': 'high-chairs',
+    'lactancia': 'breastfeeding',
+    'andadera': 'walker',
+    'cunas': 'cribs',
+    'sobre-ruedas': 'wheels',
+    'carriolas': 'strollers',
+    'nina': 'girl',
+    'nino': 'boy',
+    'autoasiento': 'car-seat',
+    'mecedora': 'rocking-chair',
+    'libros': 'books',
+    'accesorios-cunas': 'crib-accessories',
+    'seguridad': 'safety',
+    'ropa-dama': 'women-clothing',
+    'correpasillos': 'ride-on',
+    'otros-paseo': 'other-travel',
+    'bano': 'bathroom',
+    'disfraz': 'costume',
+    'juegos-grandes': 'large-toys',
+    'TRAINTHIN': 'train',
+    'Stroller-EP': 'stroller-main',
+    'Cradle-EP': 'cradle-main',
+    'Food-EP': 'food-main',
+    'Bath-EP': 'bath-main',
+    'Dress-EP': 'dress-main'
+}
+
+
+def english_name_for(name):
+    """English name used in file names and components."""
+    return ICON_MAPPING.get(name, name.lower().replace(' ', '-'))
+
+
+PATH_TOKEN_RE = re.compile(r'[A-Za-z]|[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?')
+PATH_ARG_COUNTS = {'M': 2, 'L': 2, 'H': 1, 'V': 1, 'C': 6, 'S': 4, 'Q': 4, 'T': 2, 'A': 7, 'Z': 0}
+
+
+def parse_path(d):
+    """Split path data into absolute segments: [(command, [numbers])].
+
+    Relative commands are resolved against the current point, so the result
+    only uses upper-case commands (Z included).
+    """
+    tokens = PATH_TOKEN_RE.findall(d)
+    segments = []
+    x = y = start_x = start_y = 0.0
+    i = 0
+    command = None
+    while i < len(tokens):
+        if tokens[i].isalpha():
+            command = tokens[i]
+            i += 1
+            if command in 'Zz':
+                segments.append(('Z', []))
+                x, y = start_x, start_y
+                continue
+        count = PATH_ARG_COUNTS[command.upper()]
+        args = [float(token) for token in tokens[i:i + count]]
+        i += count
+        relative = command.islower()
+        upper = command.upper()
+
+        if upper == 'H':
+            args = [args[0] + x if relative else args[0]]
+            x = args[0]
+        elif upper == 'V':
+            args = [args[0] + y if relative else args[0]]
+            y = args[0]
+        elif upper == 'A':
+            if relative:
+                args[5] += x
+                args[6] += y
+            x, y = args[5], args[6]
+        else:
+            if relative:
+                args = [value + (y if j % 2 else x) for j, value in enumerate(args)]
+            x, y = args[-2], args[-1]
+
+        segments.append((upper, args))
+        if upper == 'M':
+            start_x, start_y = x, y
+            # Extra coordinate pairs after a moveto are implicit linetos
+            command = 'l' if relative else 'L'
+    return segments
+
+
+def format_number(value, precision):
+    """Shortest text for a rounded number: no trailing zeros, no leading zero."""
+    text = f'{value:.{precision}f}'
+    if '.' in text:
+        text = text.rstrip('0').rstrip('.')
+    if text in ('-0', ''):
+        text = '0'
+    if text.startswith('0.'):
+        text = text[1:]
+    elif text.startswith('-0.'):
+        text = '-' + text[2:]
+    return text
+
+
+def join_numbers(numbers):
+    """Join numbers dropping separators where the next one can't be misread."""
+    out = ''
+    last = ''
+    for text in numbers:
+        if out and not (text[0] == '-' or (text[0] == '.' and '.' in last)):
+            out += ' '
+        out += text
+        last = text
+    return out
+
+
+def minify_path(d, precision=DEFAULT_PRECISION):
+    """Re-emit path data rounded to precision decimals, choosing relative or
+    absolute per segment (whichever is shorter). Coordinates are rounded in
+    absolute space first, so relative offsets never accumulate drift.
+    """
+    def r(value):
+        return round(value, precision)
+
+    out = []
+    previous = None
+    x = y = start_x = start_y = 0.0
+    for command, args in parse_path(d):
+        if command == 'Z':
+            out.append('z')
+            previous = 'z'
+            x, y = start_x, start_y
+            continue
+
+        if command == 'H':
+            absolute = [r(args[0])]
+            relative = [absolute[0] - x]
+            end = (absolute[0], y)
+        elif command == 'V':
+            absolute = [r(args[0])]
+            relative = [absolute[0] - y]
+            end = (x, absolute[0])
+        elif command == 'A':
+            absolute = [r(value) for value in args]
+            relative = absolute[:5] + [absolute[5] - x, absolute[6] - y]
+            end = (absolute[5], absolute[6])
+        else:
+            absolute = [r(value) for value in args]
+            relative = [value - (y if j % 2 else x) for j, value in enumerate(absolute)]
+            end = (absolute[-2], absolute[-1])
+
+        candidates = []
+        for letter, values in ((command.lower(), relative), (command, absolute)):
+            body = join_numbers([format_number(value, precision) for value in values])
+            # A repeated command letter can be omitted (not after a moveto,
+            # where the implicit command would be a lineto)
+            prefix = '' if letter == previous and letter not in 'Mm' else letter
+            if prefix == '' and body[0] != '-':
+                body = ' ' + body
+            candidates.append((len(prefix) + len(body), prefix + body, letter))
+        _, text, previous = min(candidates)
+        out.append(text)
+
+        x, y = end
+        if command == 'M':
+            start_x, start_y = x, y
+    return ''.join(out)
+
+
+def flip_path(d, ascent, precision=3):
+    """Font glyph path (y up from baseline) -> SVG path in the 1024 box (y down)."""
+    out = []
+    for command, args in parse_path(d):
+        if command == 'Z':
+            out.append('z')
+            continue
+        args = list(args)
+        if command == 'V':
+            args[0] = ascent - args[0]
+        elif command == 'A':
+            # Mirroring flips the rotation and the sweep direction
+            args[2] = -args[2]
+            args[4] = 1 - args[4]
+            args[6] = ascent - args[6]
+        elif command != 'H':
+            args = [ascent - value if j % 2 else value for j, value in enumerate(args)]
+        out.append(command + join_numbers([format_number(value, precision) for value in args]))
+    return ''.join(out)
+
+
+class Icon:
+    """One icon: names, code point and path data in the 1024 box."""
+
+    __slots__ = ('name', 'english_name', 'code', 'paths', 'source')
+
+    def __init__(self, name, code, paths, source):
+        self.name = name
+        self.english_name = english_name_for(name)
+        self.code = code
+        self.paths = paths
+        self.source = source
+
+    def svg(self, size=24, color='currentColor'):
+        """Standalone SVG markup at the given pixel size."""
+        body = '\n'.join(f'  <path d="{path}" fill="{color}"/>' for path in self.paths)
+        return (f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="{VIEWBOX}" '
+                f'width="{size}" height="{size}">\n{body}\n</svg>')
+
+    def __repr__(self):
+        return f"Icon({self.name!r}, code={self.code:#x}, source={self.source!r})"
+
+
+def read_selection(path=SELECTION_FILE):
+    """Icons from the IcoMoon selection.json, in file order."""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    icons = []
+    for icon in data['icons']:
+        if 'icon' in icon and 'paths' in icon['icon']:
+            props = icon['properties']
+            icons.append(Icon(props['name'], props.get('code', 0), icon['icon']['paths'], 'selection'))
+    return icons
+
+
+def read_font(path=FONT_FILE):
+    """Icons from the SVG font, in glyph order, flipped into the 1024 box."""
+    root = ET.parse(path).getroot()
+    face = root.find(f'.//{SVG_NS}font-face')
+    ascent = float(face.get('ascent', GRID)) if face is not None else float(GRID)
+    icons = []
+    for glyph in root.iter(f'{SVG_NS}glyph'):
+        unicode_val = glyph.get('unicode')
+        d = glyph.get('d')
+        # Skip the space glyph and any other empty glyph
+        if unicode_val and d:
+            name = glyph.get('glyph-name') or f'u{ord(unicode_val):04x}'
+            icons.append(Icon(name, ord(unicode_val), [flip_path(d, ascent)], 'font'))
+    return icons
+
+
+SOURCES = {
+    'selection': (read_selection, SELECTION_FILE),
+    'font': (read_font, FONT_FILE),
+}
+
+
+class IconLibrary:
+    """Lazily loaded icons of one source with O(1) lookups."""
+
+    def __init__(self, source='selection', path=None, fallback=None):
+        if source not in SOURCES:
+            raise ValueError(f"Unknown icon source {source!r}; use one of {', '.join(SOURCES)}")
+        self.source = source
+        self.path = path or SOURCES[source][1]
+        self.fallback = fallback
+        self._icons = None
+        self._svg_cache = {}
+
+    def _load(self):
+        """Read the source once and build every index in the same pass."""
+        reader = SOURCES[self.source][0]
+        self._icons = []
+        self.by_name = {}
+        self.by_code = {}
+        for icon in reader(self.path):
+            self._icons.append(icon)
+            self.by_name[icon.name] = icon
+            self.by_name.setdefault(icon.english_name, icon)
+            self.by_code[icon.code] = icon
+
+    @property
+    def icons(self):
+        if self._icons is None:
+            self._load()
+        return self._icons
+
+    def __iter__(self):
+        return iter(self.icons)
+
+    def __len__(self):
+        return len(self.icons)
+
+    def get(self, key):
+        """Icon by original name, English name or code point (None if missing)."""
+        self.icons  # load on first use
+        if isinstance(key, int):
+            return self.by_code.get(key)
+        return self.by_name.get(key)
+
+    def get_icon(self, name, size=24):
+        """SVG markup of an icon at a size, memoized per (name, size).
+
+        Icons missing from this source, or the whole source if its file is
+        not there, are taken from the fallback library when there is one.
+        """
+        key = (name, size)
+        if key not in self._svg_cache:
+            try:
+                icon = self.get(name)
+            except FileNotFoundError:
+                if self.fallback is None:
+                    raise
+                icon = None
+            if icon is not None:
+                self._svg_cache[key] = icon.svg(size)
+            elif self.fallback is not None:
+                self._svg_cache[key] = self.fallback.get_icon(name, size)
+            else:
+                raise KeyError(f"Unknown icon {name!r} in {self.path}")
+        return self._svg_cache[key]
+
+
+@functools.lru_cache(maxsize=None)
+def library(source='selection'):
+    """Shared IconLibrary per source (still loaded lazily).
+
+    selection.json falls back to the SVG font for get_icon().
+    """
+    fallback = library('font') if source == 'selection' else None
+    return IconLibrary(source, fallback=fallback)
+
+
+def get_icon(name, size=24, source='selection'):
+    """SVG markup of an icon from the shared library of a source."""
+    return library(source).get_icon(name, size)
+
+
+def bounding_box(paths):
+    """(min_x, min_y, max_x, max_y) of the end points of some path data."""
+    xs, ys = [], []
+    for d in paths:
+        for command, args in parse_path(d):
+            if command == 'H':
+                xs.append(args[0])
+            elif command == 'V':
+                ys.append(args[0])
+            elif command == 'A':
+                xs.append(args[5])
+                ys.append(args[6])
+            elif command != 'Z':
+                xs.extend(args[0::2])
+                ys.extend(args[1::2])
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+def cross_check(selection=None, font=None, tolerance=1.0):
+    """Compare both sources; returns a list of differences (empty if they agree).
+
+    Checks that the same code points exist with the same names and that
+    every icon has the same bounding box (within tolerance font units).
+    Contours are not compared one by one: the font merges an icon's paths
+    into a single glyph and splits them differently.
+    """
+    selection = selection or library('selection')
+    font = font or library('font')
+    problems = []
+
+    # Force both lazy loads before touching the indexes
+    selection.icons, font.icons
+    for code in sorted(set(selection.by_code) | set(font.by_code)):
+        a, b = selection.get(code), font.get(code)
+        if a is None or b is None:
+            missing = 'selection.json' if a is None else 'font'
+            problems.append(f"{(a or b).name} ({code:#x}): missing in {missing}")
+            continue
+        if a.name != b.name:
+            problems.append(f"{code:#x}: named {a.name!r} in selection.json but {b.name!r} in font")
+        box_a, box_b = bounding_box(a.paths), bounding_box(b.paths)
+        if any(abs(p - q) > tolerance for p, q in zip(box_a, box_b)):
+            problems.append(f"{a.name}: bounding box {[round(v) for v in box_a]} vs "
+                            f"{[round(v) for v in box_b]}")
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Entrepeques icon library")
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('check', help="verify that selection.json and the SVG font agree")
+    list_parser = commands.add_parser('list', help="list the icons of a source")
+    list_parser.add_argument('--source', choices=sorted(SOURCES), default='selection')
+    show = commands.add_parser('show', help="print the SVG of one icon")
+    show.add_argument('name', help="original name, English name or code point (0xe900)")
+    show.add_argument('--size', type=int, default=24)
+    show.add_argument('--source', choices=sorted(SOURCES), default='selection')
+    args = parser.parse_args(argv)
+
+    if args.command == 'check':
+        problems = cross_check()
+        print(f"🔎 selection.json: {len(library('selection'))} icons, font: {len(library('font'))} glyphs")
+        for problem in problems:
+            print(f"❌ {problem}")
+        if problems:
+            return 1
+        print("✅ Both sources agree")
+    elif args.command == 'list':
+        for icon in library(args.source):
+            print(f"{icon.code:#06x}  {icon.name:24} {icon.english_name}")
+    else:
+        name = int(args.name, 16) if args.name.lower().startswith('0x') else args.name
+        try:
+            print(get_icon(name, args.size, args.source))
+        except KeyError:
+            print(f"❌ Unknown icon {args.name!r}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
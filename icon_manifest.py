@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""Content-addressed output for the icon extractors.
+
+Every icon is written as ep-<name>.<hash>.svg, where the hash covers the
+icon's path data and the markup template that renders it. A manifest
+(icons-manifest.json) maps each icon name to its current file so the apps
+can resolve icons without hardcoding hashes. On the next run an icon whose
+hash matches the manifest (and whose file still exists) is skipped, and
+files that are no longer referenced are deleted.
+"""
+import hashlib
+import json
+from pathlib import Path
+
+MANIFEST_FILE = 'icons-manifest.json'
+MANIFEST_VERSION = 1
+HASH_BYTES = 4  # 8 hex chars in filenames
+# Manifest sections holding hashed files: single icons and the sprite
+SECTIONS = ('icons', 'sprite')
+
+
+def content_hash(*parts):
+    """Short hash of the given strings (order matters)."""
+    digest = hashlib.blake2b(digest_size=HASH_BYTES)
+    for part in parts:
+        digest.update(part.encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+def load_manifest(output_dir):
+    """Previous manifest, or an empty one if missing or unreadable."""
+    try:
+        with open(Path(output_dir) / MANIFEST_FILE, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if manifest.get('version') != MANIFEST_VERSION:
+        return {}
+    return manifest
+
+
+class HashedOutput:
+    """Tracks one incremental run: what was written, skipped and removed."""
+
+    def __init__(self, output_dir, generator, source):
+        self.output_dir = Path(output_dir)
+        self.generator = generator
+        self.source = source
+        self.previous = load_manifest(output_dir)
+        # Files from another generator are never reused (but still pruned)
+        self.reusable = self.previous.get('generator') == generator
+        self.entries = {}
+        self.written = []
+        self.skipped = []
+
+    def _previous_entry(self, section, key):
+        if not self.reusable:
+            return None
+        return self.previous.get(section, {}).get(key)
+
+    def write(self, key, stem, digest, render, section='icons', suffix='.svg', **extra):
+        """Write <stem>.<digest><suffix> unless the manifest already has it.
+
+        render() is only called when the file has to be (re)written.
+        Returns the file name.
+        """
+        filename = f"{stem}.{digest}{suffix}"
+        previous = self._previous_entry(section, key)
+        if previous and previous['hash'] == digest and (self.output_dir / filename).exists():
+            self.skipped.append(filename)
+        else:
+            with open(self.output_dir / filename, 'w', encoding='utf-8') as f:
+                f.write(render())
+            self.written.append(filename)
+
+        self.entries.setdefault(section, {})[key] = dict(file=filename, hash=digest, **extra)
+        return filename
+
+    def file_for(self, key, section='icons'):
+        return self.entries[section][key]['file']
+
+    def finish(self):
+        """Delete files the new manifest no longer references and save it.
+
+        Sections this run did not touch (e.g. the sprite in per-icon mode)
+        are kept as they were.
+        """
+        current = {entry['file'] for entries in self.entries.values() for entry in entries.values()}
+        removed = []
+        for section in self.entries:
+            for entry in self.previous.get(section, {}).values():
+                stale = self.output_dir / entry['file']
+                if entry['file'] not in current and stale.exists():
+                    stale.unlink()
+                    removed.append(entry['file'])
+
+        kept = {section: self.previous[section] for section in SECTIONS
+                if section in self.previous and section not in self.entries}
+        manifest = {
+            'version': MANIFEST_VERSION,
+            'generator': self.generator,
+            'source': self.source,
+            **kept,
+            **self.entries,
+        }
+        with open(self.output_dir / MANIFEST_FILE, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2, ensure_ascii=False, sort_keys=True)
+            f.write('\n')
+
+        print(f"🔁 Incremental: {len(self.written)} written, {len(self.skipped)} unchanged, "
+              f"{len(removed)} removed")
+        print(f"🗂️  Manifest at {self.output_dir}/{MANIFEST_FILE}")
+        return removed
+
+
+def write_if_changed(path, content):
+    """Write a generated file only when its content differs. Returns True if written."""
+    path = Path(path)
+    try:
+        if path.read_text(encoding='utf-8') == content:
+            return False
+    except OSError:
+        pass
+    path.write_text(content, encoding='utf-8')
+    return True
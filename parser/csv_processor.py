@@ -3,67 +3,106 @@
 """
 Script FINAL para corregir el archivo CSV feature_client.csv
 VERSION CORREGIDA - Arregla el campo options correctamente
+
+Uso:
+    python csv_processor.py                              # feature_client.csv → feature_def_FINAL.csv
+    python csv_processor.py DIR|GLOB ... [-o DIR] [-j N]  # modo lote en paralelo
+    python csv_processor.py ... --chunk-mb 64             # reparte cada archivo entre procesos
+    python csv_processor.py ... --options-format json --snapshot features.pickle
+    python csv_processor.py ... --incremental             # sólo filas nuevas o modificadas
+    python csv_processor.py ... --pg-dsn [DSN]            # carga en PostgreSQL con COPY
 """
 
+import argparse
 import csv
+import glob
+import hashlib
+import io
+import mmap
+import json
+import os
+import pickle
 import re
 import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 
-def fix_encoding(text):
-    """Corrige caracteres especiales mal codificados"""
-    if not isinstance(text, str):
-        return text
-    
-    # Mapeo de caracteres corruptos a correctos
-    text = text.replace('√©', 'é')
-    text = text.replace('√°', 'á')
-    text = text.replace('√≠', 'í')
-    text = text.replace('√≥', 'ó')
-    text = text.replace('√∫', 'ú')
-    text = text.replace('√±', 'ñ')
-    text = text.replace('√Ä', 'Á')
-    text = text.replace('√â', 'É')
-    text = text.replace('√ã', 'Í')
-    text = text.replace('√ì', 'Ó')
-    text = text.replace('√∞', 'Ú')
-    text = text.replace('√Ñ', 'Ñ')
-    
+# Secuencias corruptas (mojibake) -> carácter correcto.
+# Para soportar una nueva secuencia basta con agregarla aquí.
+ENCODING_FIXES = {
+    '√©': 'é',
+    '√°': 'á',
+    '√≠': 'í',
+    '√≥': 'ó',
+    '√∫': 'ú',
+    '√±': 'ñ',
+    '√Ä': 'Á',
+    '√â': 'É',
+    '√ã': 'Í',
+    '√ì': 'Ó',
+    '√∞': 'Ú',
+    '√Ñ': 'Ñ',
     # Otros mapeos comunes
-    text = text.replace('Ã¡', 'á')
-    text = text.replace('Ã©', 'é')
-    text = text.replace('Ã­', 'í')
-    text = text.replace('Ã³', 'ó')
-    text = text.replace('Ãº', 'ú')
-    text = text.replace('Ã±', 'ñ')
+    'Ã¡': 'á',
+    'Ã©': 'é',
+    'Ã\xad': 'í',
+    'Ã³': 'ó',
+    'Ãº': 'ú',
+    'Ã±': 'ñ',
+}
+
+def compile_encoding_repair(fixes):
+    """Compila una tabla de correcciones en una función de una sola pasada"""
+    # Ordenar por longitud para que las secuencias largas ganen a sus prefijos
+    keys = sorted(fixes, key=len, reverse=True)
+    pattern = re.compile('|'.join(re.escape(key) for key in keys))
+    lead_chars = frozenset(key[0] for key in keys)
+    replace = lambda match: fixes[match.group(0)]
+    
+    def repair(text):
+        if not isinstance(text, str):
+            return text
+        # Camino rápido: la mayoría de las líneas no traen ningún carácter inicial
+        for char in lead_chars:
+            if char in text:
+                return pattern.sub(replace, text)
+        return text
     
-    return text
+    return repair
+
+_repair_encoding = compile_encoding_repair(ENCODING_FIXES)
+
+def fix_encoding(text):
+    """Corrige caracteres especiales mal codificados"""
+    return _repair_encoding(text)
+
+# Tramo entre comillas ("" es una comilla escapada); si no se cierra,
+# llega hasta el final de la línea. El grupo captura el contenido.
+_QUOTED_RE = re.compile(r'"((?:[^"]|"")*)(?:"|\Z)')
 
 def parse_csv_line(line):
     """Parsea una línea CSV manualmente para manejar mejor las comillas"""
+    # Camino rápido: sin comillas basta con partir por comas
+    if '"' not in line:
+        return [field.strip() for field in line.split(',')] if line else []
+    
+    # split alterna texto sin comillas (pares) y contenido entre comillas (impares)
     fields = []
     current_field = ''
-    in_quotes = False
-    i = 0
-    
-    while i < len(line):
-        char = line[i]
-        
-        if char == '"':
-            if in_quotes and i + 1 < len(line) and line[i + 1] == '"':
-                # Doble comilla escapada
-                current_field += '"'
-                i += 1  # Saltar la siguiente comilla
-            else:
-                # Cambiar estado de comillas
-                in_quotes = not in_quotes
-        elif char == ',' and not in_quotes:
-            # Fin del campo
-            fields.append(current_field.strip())
-            current_field = ''
-        else:
-            current_field += char
+    for index, piece in enumerate(_QUOTED_RE.split(line)):
+        if index % 2:
+            current_field += piece.replace('""', '"')
+            continue
         
-        i += 1
+        # Las comas sólo separan campos fuera de comillas
+        parts = piece.split(',')
+        if len(parts) == 1:
+            current_field += piece
+            continue
+        fields.append((current_field + parts[0]).strip())
+        fields.extend(part.strip() for part in parts[1:-1])
+        current_field = parts[-1]
     
     # Agregar el último campo
     if current_field or line.endswith(','):
@@ -71,59 +110,133 @@ def parse_csv_line(line):
     
     return fields
 
-def reconstruct_options_field(fields, start_index=8):
-    """Reconstruye el campo options correctamente"""
-    if start_index >= len(fields):
-        return ''
-    
-    # Buscar el campo que contiene '['
-    options_start = -1
-    for i in range(start_index, len(fields)):
-        if fields[i] and '[' in fields[i]:
-            options_start = i
-            break
-    
-    if options_start == -1:
+# Celdas que marcan el fin de options (horas y fechas de created_at/updated_at)
+_OPTIONS_END_RE = re.compile(r'\d+:\d+|\d{4}-\d{2}-\d{2}')
+
+# Normalización de comillas alrededor de las comas, aplicada en este orden
+_QUOTE_FIXES = [
+    (re.compile(r'\'\s*,\s*\''), "', '"),
+    (re.compile(r'"\s*,\s*"'), '", "'),
+    (re.compile(r'\'"\s*,\s*\'"'), "', '"),
+    (re.compile(r'"\'\s*,\s*\'"'), "', '"),
+]
+_TRAILING_JUNK = ',\'"'
+_ITEM_STRIP = ' \'"'
+
+# Con campos sin comas propias ni espacios en los bordes, las correcciones
+# sólo pueden tocar 3 caracteres a cada lado de la coma que une dos campos,
+# así que cada frontera se resuelve por separado (y se memoriza). Campos más
+# cortos podrían encadenar correcciones entre fronteras: ahí se aplican las
+# regex en orden sobre el texto unido.
+_FOLD_WINDOW = 3
+_MIN_FOLD_LENGTH = 2 * _FOLD_WINDOW
+_FIELD_SEPARATOR = '\x00'
+# Ventana -> ventana corregida; se vacía al llegar al límite
+_BOUNDARY_CACHE_SIZE = 4096
+_boundary_fixes = {}
+
+def _fix_boundary(window):
+    """Aplica _QUOTE_FIXES en orden a 'abc,def' (los bordes de dos campos)"""
+    fixed = window
+    for pattern, replacement in _QUOTE_FIXES:
+        fixed = pattern.sub(replacement, fixed)
+    if len(_boundary_fixes) >= _BOUNDARY_CACHE_SIZE:
+        _boundary_fixes.clear()
+    _boundary_fixes[window] = fixed
+    return fixed
+
+def _options_text(fields, start_index):
+    """Un solo recorrido: ubica el array, lo une y corrige las comillas"""
+    tail = fields[start_index:]
+    # Camino rápido: una búsqueda en C en lugar de revisar campo por campo
+    joined = _FIELD_SEPARATOR.join(tail)
+    start = joined.find('[')
+    if start == -1:
         return ''
+    # Un campo que ya trae el separador movería la cuenta: recorrer desde el inicio
+    if joined.count(_FIELD_SEPARATOR) == len(tail) - 1:
+        start = joined.count(_FIELD_SEPARATOR, 0, start)
+    else:
+        start = 0
     
-    # Reconstruir el array completo
     options_parts = []
-    for i in range(options_start, len(fields)):
-        if not fields[i]:
+    pieces = []
+    # Texto del último campo que todavía no se agrega a pieces
+    pending = None
+    inside = False
+    for part in tail[start:]:
+        if not part:
             continue
-            
-        part = fields[i]
-        options_parts.append(part)
         
-        # Si encontramos el cierre del array, parar
-        if ']' in part:
-            break
+        if not inside:
+            # Buscar el campo que contiene '['
+            if '[' not in part:
+                continue
+            inside = True
         
+        closes = ']' in part
         # Si encontramos números/fechas, parar (ya no es parte del options)
-        if re.match(r'^\d+:\d+', part) or re.match(r'^\d{4}-\d{2}-\d{2}', part):
-            options_parts.pop()  # Quitar este campo
+        if not closes and _OPTIONS_END_RE.match(part):
+            break
+        
+        options_parts.append(part)
+        if pieces is not None:
+            if (len(part) < _MIN_FOLD_LENGTH or ',' in part
+                    or part[0].isspace() or part[-1].isspace()):
+                pieces = None
+            elif pending is None:
+                pending = part
+            else:
+                # Unir y corregir las comillas de la frontera en el mismo recorrido
+                window = pending[-_FOLD_WINDOW:] + ',' + part[:_FOLD_WINDOW]
+                pieces.append(pending[:-_FOLD_WINDOW])
+                pieces.append(_boundary_fixes.get(window) or _fix_boundary(window))
+                pending = part[_FOLD_WINDOW:]
+        
+        # Si encontramos el cierre del array, parar
+        if closes:
             break
     
     if not options_parts:
         return ''
+    if pieces is not None:
+        pieces.append(pending)
+        return ''.join(pieces)
     
-    # Unir las partes
+    # Respaldo: las correcciones en orden sobre el texto unido
     options_text = ','.join(options_parts)
+    quoted = options_text.startswith('"') and options_text.endswith('"')
+    if quoted:
+        options_text = options_text[1:-1]
+    for pattern, replacement in _QUOTE_FIXES:
+        options_text = pattern.sub(replacement, options_text)
+    return '"' + options_text + '"' if quoted else options_text
+
+def options_items(options_text):
+    """Extrae la lista de opciones de la versión en texto"""
+    inner = options_text
+    if inner.startswith('['):
+        inner = inner[1:]
+    if inner.endswith(']'):
+        inner = inner[:-1]
+    items = (item.strip(_ITEM_STRIP) for item in inner.split(','))
+    return [item for item in items if item]
+
+def reconstruct_options_field(fields, start_index=8):
+    """Reconstruye el campo options correctamente"""
+    options_text = _options_text(fields, start_index)
+    if not options_text:
+        return ''
     
-    # Limpiar el formato
-    # Quitar comillas externas si las hay
+    # Quitar comillas externas si las hay (las correcciones no tocan los extremos)
     if options_text.startswith('"') and options_text.endswith('"'):
         options_text = options_text[1:-1]
     
-    # Arreglar el formato del array
-    # Reemplazar las comillas mal formateadas
-    options_text = re.sub(r'\'\s*,\s*\'', "', '", options_text)
-    options_text = re.sub(r'"\s*,\s*"', '", "', options_text)
-    options_text = re.sub(r'\'"\s*,\s*\'"', '\', \'', options_text)
-    options_text = re.sub(r'"\'\s*,\s*\'"', '\', \'', options_text)
-    
     # Limpiar caracteres extra al final
-    options_text = re.sub(r'[,\s\'"]+$', '', options_text)
+    end = len(options_text)
+    while end and (options_text[end - 1] in _TRAILING_JUNK or options_text[end - 1].isspace()):
+        end -= 1
+    options_text = options_text[:end]
     
     # Asegurar que termina correctamente
     if options_text.startswith('[') and not options_text.endswith(']'):
@@ -131,93 +244,475 @@ def reconstruct_options_field(fields, start_index=8):
     
     return options_text
 
-def process_csv_file(input_file, output_file):
-    """Procesa el archivo CSV y genera la versión corregida"""
+def reconstruct_options(fields, start_index=8):
+    """Reconstruye options y devuelve (texto, lista de opciones)"""
+    options_text = reconstruct_options_field(fields, start_index)
+    return options_text, options_items(options_text)
+
+# Columnas requeridas en el orden correcto
+REQUIRED_COLUMNS = [
+    'id', 'subcategory_id', 'name', 'display_name', 'type',
+    'order_index', 'options', 'created_at', 'updated_at', 'mandatory'
+]
+
+# Cuántas filas de ejemplo se muestran al terminar
+SAMPLE_ROWS = 3
+
+# Modo lote: sufijo de los archivos corregidos y resumen combinado
+OUTPUT_SUFFIX = '_FINAL'
+DEFAULT_OUTPUT_DIR = 'corregidos'
+BATCH_SUMMARY_FILE = 'resumen_lote.csv'
+
+# Formatos de salida del campo options y snapshot binario de la tabla
+OPTIONS_FORMATS = ('texto', 'json')
+SNAPSHOT_SUFFIX = '.pickle'
+SNAPSHOT_VERSION = 1
+
+# Modo incremental: manifest con el hash de la línea de origen de cada fila
+MANIFEST_SUFFIX = '.manifest.json'
+MANIFEST_VERSION = 1
+
+# Tamaño aproximado de cada rango cuando un archivo se reparte entre procesos
+DEFAULT_CHUNK_SIZE = 64 * 1024 * 1024
+
+def build_clean_row(line, line_number):
+    """Convierte una línea cruda en un registro limpio (o None si se descarta)"""
+    line = line.strip()
+    if not line:
+        return None
+    
+    # Aplicar corrección de caracteres
+    line = fix_encoding(line)
+    
+    # Parsear la línea
+    try:
+        fields = parse_csv_line(line)
+    except Exception as e:
+        print(f"⚠️  Error parseando línea {line_number}: {e}")
+        return None
     
-    # Columnas requeridas en el orden correcto
-    required_columns = [
-        'id', 'subcategory_id', 'name', 'display_name', 'type', 
-        'order_index', 'options', 'created_at', 'updated_at', 'mandatory'
-    ]
+    # Verificar que tenga datos suficientes
+    if len(fields) < 12 or not fields[0] or not fields[0].isdigit():
+        return None
     
-    processed_rows = []
+    # Reconstruir el campo options
+    options_text = reconstruct_options_field(fields, 8)
     
+    # Crear registro limpio
     try:
-        # Leer el archivo
-        with open(input_file, 'r', encoding='utf-8', newline='') as file:
-            lines = file.readlines()
-        
-        print(f"✓ Archivo leído: {len(lines)} líneas")
+        clean_row = {
+            'id': int(fields[0]),
+            'subcategory_id': int(fields[1]) if fields[1] and fields[1].isdigit() else 0,
+            'name': fields[4].strip() if len(fields) > 4 else '',
+            'display_name': fields[5].strip() if len(fields) > 5 else '',
+            'type': fields[6].strip() if len(fields) > 6 else '',
+            'order_index': int(fields[7]) if len(fields) > 7 and fields[7].isdigit() else 0,
+            'options': options_text,
+            'created_at': '2024-01-01 00:00:00',
+            'updated_at': '2024-01-01 00:00:00',
+            'mandatory': 't' if (len(fields) > 11 and fields[11] in ['t', 'TRUE']) else 'f'
+        }
+    except (ValueError, IndexError) as e:
+        print(f"⚠️  Error procesando línea {line_number}: {e}")
+        return None
+    
+    # Solo aceptar si tiene datos esenciales
+    if not (clean_row['name'] and clean_row['display_name']):
+        return None
+    
+    return clean_row
+
+def options_json(options_text):
+    """Versión JSON canónica del campo options ('' si no hay array)"""
+    if not options_text:
+        return ''
+    return json.dumps(options_items(options_text), ensure_ascii=False)
+
+def iter_clean_rows(lines, first_line_number=1, options_format='texto'):
+    """Genera registros limpios uno a uno a partir de un iterable de líneas"""
+    for line_number, line in enumerate(lines, first_line_number):
+        clean_row = build_clean_row(line, line_number)
+        if clean_row is not None:
+            if options_format == 'json':
+                clean_row['options'] = options_json(clean_row['options'])
+            yield clean_row
+
+def has_accents(options_text):
+    """Indica si el campo options contiene acentos restaurados"""
+    return 'é' in options_text or 'á' in options_text or 'ó' in options_text
+
+def new_stats():
+    """Contadores acumulados durante el procesamiento"""
+    return {'lines': 0, 'rows': 0, 'with_accents': 0, 'samples': []}
+
+def write_clean_rows(rows, file, stats, header=True, sink=None):
+    """Escribe registros con DictWriter actualizando los contadores al vuelo.
+    
+    Si se indica sink (p. ej. pg_loader.FeatureDefinitionsSink) cada fila
+    también se le entrega en cuanto se escribe.
+    """
+    writer = csv.DictWriter(file, fieldnames=REQUIRED_COLUMNS)
+    if header:
+        writer.writeheader()
+    for row in rows:
+        writer.writerow(row)
+        if sink is not None:
+            sink.write(row)
+        stats['rows'] += 1
+        if has_accents(str(row['options'])):
+            stats['with_accents'] += 1
+        if len(stats['samples']) < SAMPLE_ROWS:
+            stats['samples'].append(row)
+    return stats
+
+def count_lines(lines, stats, skip_header=True):
+    """Cuenta las líneas leídas y salta el header si corresponde"""
+    for line_number, line in enumerate(lines):
+        stats['lines'] += 1
+        if line_number > 0 or not skip_header:
+            yield line
+
+def stream_csv_file(input_file, output_file, options_format='texto', sink=None):
+    """Corrige el archivo línea por línea sin cargarlo completo en memoria"""
+    stats = new_stats()
+    
+    with open(input_file, 'r', encoding='utf-8', newline='') as src, \
+         open(output_file, 'w', encoding='utf-8', newline='') as dst:
+        rows = iter_clean_rows(count_lines(src, stats), options_format=options_format)
+        write_clean_rows(rows, dst, stats, sink=sink)
+    
+    return stats
+
+def find_chunk_boundaries(input_file, chunk_size):
+    """Divide el archivo en rangos de bytes que terminan en fin de línea.
+    
+    Un corte nunca cae dentro de un campo entre comillas que contenga un
+    salto de línea: se avanza al siguiente salto con paridad de comillas par.
+    Devuelve tuplas (inicio, fin, número de la primera línea).
+    """
+    size = os.path.getsize(input_file)
+    if size == 0:
+        return [(0, 0, 0)]
+    
+    starts = [(0, 0)]
+    with open(input_file, 'rb') as file, \
+         mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        scanned = 0
+        in_quotes = 0
+        line_number = 0
         
-        # Procesar cada línea (saltar header)
-        for i, line in enumerate(lines[1:], 1):
-            line = line.strip()
-            if not line:
-                continue
-            
-            # Aplicar corrección de caracteres
-            line = fix_encoding(line)
-            
-            # Parsear la línea
-            try:
-                fields = parse_csv_line(line)
-            except Exception as e:
-                print(f"⚠️  Error parseando línea {i}: {e}")
-                continue
+        while starts[-1][0] + chunk_size < size:
+            newline = data.find(b'\n', starts[-1][0] + chunk_size)
+            while newline != -1:
+                block = data[scanned:newline + 1]
+                in_quotes ^= block.count(b'"') & 1
+                line_number += block.count(b'\n')
+                scanned = newline + 1
+                if not in_quotes:
+                    break
+                newline = data.find(b'\n', scanned)
             
-            # Verificar que tenga datos suficientes
-            if len(fields) < 12 or not fields[0] or not fields[0].isdigit():
+            if newline == -1 or scanned >= size:
+                break
+            starts.append((scanned, line_number))
+    
+    ends = [start for start, _ in starts[1:]] + [size]
+    return [(start, end, line_number)
+            for (start, line_number), end in zip(starts, ends)]
+
+def _chunk_worker(job):
+    """Corrige un rango de bytes y devuelve el CSV resultante (sin header)"""
+    input_file, options_format, start, end, first_line_number = job
+    with open(input_file, 'rb') as file:
+        file.seek(start)
+        text = file.read(end - start).decode('utf-8')
+    
+    stats = new_stats()
+    output = io.StringIO()
+    lines = count_lines(io.StringIO(text, newline=''), stats, skip_header=(start == 0))
+    rows = iter_clean_rows(lines, first_line_number + (1 if start == 0 else 0),
+                           options_format)
+    write_clean_rows(rows, output, stats, header=False)
+    return output.getvalue(), stats
+
+def stream_csv_file_chunked(input_file, output_file, workers=None,
+                            chunk_size=DEFAULT_CHUNK_SIZE, options_format='texto'):
+    """Corrige un archivo grande repartiendo rangos de líneas entre procesos.
+    
+    Los resultados se escriben en el orden original del archivo, por lo que
+    la salida es idéntica byte a byte a la de stream_csv_file.
+    """
+    chunks = find_chunk_boundaries(input_file, chunk_size)
+    stats = new_stats()
+    
+    with ProcessPoolExecutor(max_workers=workers) as pool, \
+         open(output_file, 'w', encoding='utf-8', newline='') as dst:
+        csv.DictWriter(dst, fieldnames=REQUIRED_COLUMNS).writeheader()
+        
+        # Limitar los rangos en vuelo para mantener la memoria acotada
+        window = 2 * (workers or os.cpu_count() or 1)
+        pending = deque()
+        for chunk in chunks:
+            job = (input_file, options_format) + chunk
+            pending.append(pool.submit(_chunk_worker, job))
+            if len(pending) >= window:
+                _merge_chunk(pending.popleft().result(), dst, stats)
+        while pending:
+            _merge_chunk(pending.popleft().result(), dst, stats)
+    
+    return stats
+
+def _merge_chunk(result, dst, stats):
+    """Agrega la salida de un rango y acumula sus contadores"""
+    text, chunk_stats = result
+    dst.write(text)
+    for key in ('lines', 'rows', 'with_accents'):
+        stats[key] += chunk_stats[key]
+    missing = SAMPLE_ROWS - len(stats['samples'])
+    if missing > 0:
+        stats['samples'].extend(chunk_stats['samples'][:missing])
+
+def line_hash(line):
+    """Hash del contenido crudo de una línea (sin espacios extremos)"""
+    return hashlib.blake2b(line.strip().encode('utf-8'), digest_size=12).hexdigest()
+
+def manifest_path_for(output_file):
+    return output_file + MANIFEST_SUFFIX
+
+def _manifest_fingerprint(options_format):
+    """Cambia si cambian las reglas que afectan a la salida de cada fila"""
+    rules = json.dumps([MANIFEST_VERSION, options_format, sorted(ENCODING_FIXES.items())])
+    return hashlib.blake2b(rules.encode('utf-8'), digest_size=12).hexdigest()
+
+def load_previous_rows(output_file, options_format):
+    """Filas de la corrida anterior indexadas por hash de la línea de origen.
+    
+    Devuelve ({hash: fila}, {hash: id}, hashes descartados); vacío si no hay
+    manifest o si fue generado con otras reglas.
+    """
+    manifest_file = manifest_path_for(output_file)
+    if not (os.path.exists(manifest_file) and os.path.exists(output_file)):
+        return {}, {}, set()
+    
+    with open(manifest_file, 'r', encoding='utf-8') as file:
+        manifest = json.load(file)
+    if manifest.get('fingerprint') != _manifest_fingerprint(options_format):
+        return {}, {}, set()
+    
+    # El manifest guarda [id, hash] en el mismo orden que las filas de salida
+    with open(output_file, 'r', encoding='utf-8', newline='') as file:
+        rows = list(csv.DictReader(file))
+    if len(rows) != len(manifest['rows']):
+        return {}, {}, set()
+    
+    previous_rows = {}
+    previous_ids = {}
+    for (row_id, digest), row in zip(manifest['rows'], rows):
+        previous_rows[digest] = row
+        previous_ids[digest] = row_id
+    return previous_rows, previous_ids, set(manifest.get('skipped', []))
+
+def incremental_csv_file(input_file, output_file, options_format='texto', sink=None):
+    """Corrige sólo las filas nuevas o modificadas desde la corrida anterior.
+    
+    Un manifest junto a la salida guarda el hash de la línea de origen de cada
+    fila; las líneas con hash conocido se copian de la salida anterior sin
+    volver a repararlas ni parsearlas.
+    """
+    previous_rows, previous_ids, previous_skipped = load_previous_rows(
+        output_file, options_format)
+    stats = new_stats()
+    manifest_rows = []
+    skipped = []
+    changes = {'new': [], 'modified': [], 'removed': [], 'unchanged': 0}
+    seen_ids = set()
+    
+    def rows(lines):
+        for line_number, line in enumerate(lines, 1):
+            digest = line_hash(line)
+            if digest in previous_rows:
+                row = previous_rows[digest]
+                changes['unchanged'] += 1
+            elif digest in previous_skipped:
+                skipped.append(digest)
                 continue
+            else:
+                row = build_clean_row(line, line_number)
+                if row is None:
+                    if line.strip():
+                        skipped.append(digest)
+                    continue
+                if options_format == 'json':
+                    row['options'] = options_json(row['options'])
+                kind = 'modified' if row['id'] in known_ids else 'new'
+                changes[kind].append(row['id'])
             
-            # Reconstruir el campo options
-            options_text = reconstruct_options_field(fields, 8)
-            
-            # Crear registro limpio
-            try:
-                clean_row = {
-                    'id': int(fields[0]),
-                    'subcategory_id': int(fields[1]) if fields[1] and fields[1].isdigit() else 0,
-                    'name': fields[4].strip() if len(fields) > 4 else '',
-                    'display_name': fields[5].strip() if len(fields) > 5 else '',
-                    'type': fields[6].strip() if len(fields) > 6 else '',
-                    'order_index': int(fields[7]) if len(fields) > 7 and fields[7].isdigit() else 0,
-                    'options': options_text,
-                    'created_at': '2024-01-01 00:00:00',
-                    'updated_at': '2024-01-01 00:00:00',
-                    'mandatory': 't' if (len(fields) > 11 and fields[11] in ['t', 'TRUE']) else 'f'
-                }
-                
-                # Solo agregar si tiene datos esenciales
-                if clean_row['name'] and clean_row['display_name']:
-                    processed_rows.append(clean_row)
-                    
-            except (ValueError, IndexError) as e:
-                print(f"⚠️  Error procesando línea {i}: {e}")
-                continue
-        
-        print(f"✓ Procesadas {len(processed_rows)} filas válidas")
-        
-        # Escribir archivo de salida
-        with open(output_file, 'w', encoding='utf-8', newline='') as file:
-            writer = csv.DictWriter(file, fieldnames=required_columns)
-            writer.writeheader()
-            writer.writerows(processed_rows)
-        
-        print(f"✅ Archivo guardado: {output_file}")
-        
-        # Mostrar ejemplos de options corregidos
-        print(f"\n📋 EJEMPLOS DE OPTIONS CORREGIDOS:")
-        for i, row in enumerate(processed_rows[:3]):
-            print(f"{i+1}. {row['display_name']}: {row['options'][:80]}...")
-        
-        # Estadísticas
-        with_accents = sum(1 for row in processed_rows 
-                          if 'é' in str(row['options']) or 'á' in str(row['options']) or 'ó' in str(row['options']))
-        
-        print(f"\n📊 ESTADÍSTICAS:")
-        print(f"   Total de registros: {len(processed_rows)}")
-        print(f"   Registros con acentos: {with_accents}")
-        print(f"   Columnas: {len(required_columns)}")
+            row_id = int(row['id'])
+            seen_ids.add(row_id)
+            manifest_rows.append([row_id, digest])
+            yield row
+    
+    known_ids = set(previous_ids.values())
+    temp_file = output_file + '.tmp'
+    with open(input_file, 'r', encoding='utf-8', newline='') as src, \
+         open(temp_file, 'w', encoding='utf-8', newline='') as dst:
+        write_clean_rows(rows(count_lines(src, stats)), dst, stats, sink=sink)
+    os.replace(temp_file, output_file)
+    
+    changes['removed'] = sorted(known_ids - seen_ids)
+    with open(manifest_path_for(output_file), 'w', encoding='utf-8') as file:
+        json.dump({
+            'version': MANIFEST_VERSION,
+            'fingerprint': _manifest_fingerprint(options_format),
+            'source': os.path.basename(input_file),
+            'rows': manifest_rows,
+            'skipped': sorted(set(skipped)),
+        }, file)
+    
+    stats['changes'] = changes
+    return stats
+
+def print_changes(changes):
+    """Reporte de cambios de una corrida incremental"""
+    def ids(values):
+        shown = ', '.join(str(value) for value in values[:20])
+        return shown + (' ...' if len(values) > 20 else '')
+    
+    print("\n🔄 CAMBIOS (modo incremental):")
+    print(f"   Sin cambios (copiadas): {changes['unchanged']}")
+    print(f"   Nuevas: {len(changes['new'])} {ids(changes['new'])}")
+    print(f"   Modificadas: {len(changes['modified'])} {ids(changes['modified'])}")
+    print(f"   Eliminadas: {len(changes['removed'])} {ids(changes['removed'])}")
+
+def print_summary(output_file, stats):
+    """Muestra ejemplos y estadísticas de una corrida"""
+    print(f"✓ Archivo leído: {stats['lines']} líneas")
+    print(f"✓ Procesadas {stats['rows']} filas válidas")
+    print(f"✅ Archivo guardado: {output_file}")
+    
+    # Mostrar ejemplos de options corregidos
+    print("\n📋 EJEMPLOS DE OPTIONS CORREGIDOS:")
+    for i, row in enumerate(stats['samples']):
+        print(f"{i+1}. {row['display_name']}: {row['options'][:80]}...")
+    
+    print("\n📊 ESTADÍSTICAS:")
+    print(f"   Total de registros: {stats['rows']}")
+    print(f"   Registros con acentos: {stats['with_accents']}")
+    print(f"   Columnas: {len(REQUIRED_COLUMNS)}")
+    
+    if 'changes' in stats:
+        print_changes(stats['changes'])
+    
+    if 'pg' in stats:
+        print("\n🐘 POSTGRESQL (COPY + upsert):")
+        print(f"   Filas copiadas: {stats['pg']['copied']}")
+        print(f"   Insertadas: {stats['pg']['inserted']}")
+        print(f"   Actualizadas: {stats['pg']['updated']}")
+
+def new_settings(**overrides):
+    """Opciones de una corrida (procesos, tamaño de rango, formato, salidas)"""
+    settings = {'workers': None, 'chunk_size': None,
+                'options_format': 'texto', 'snapshot': None, 'incremental': False,
+                'pg_dsn': None, 'pg_batch_size': None}
+    settings.update(overrides)
+    return settings
+
+def _run_engine(input_file, output_file, settings, sink=None):
+    """Ejecuta el modo elegido; el modo por rangos no acepta sink"""
+    options_format = settings['options_format']
+    if settings['incremental']:
+        return incremental_csv_file(input_file, output_file, options_format, sink)
+    if settings['chunk_size']:
+        return stream_csv_file_chunked(input_file, output_file, settings['workers'],
+                                       settings['chunk_size'], options_format)
+    return stream_csv_file(input_file, output_file, options_format, sink)
+
+def correct_file(input_file, output_file, settings=None):
+    """Corrige un archivo con el modo indicado en settings"""
+    settings = settings or new_settings()
+    
+    if not settings['pg_dsn']:
+        stats = _run_engine(input_file, output_file, settings)
+    else:
+        import pg_loader
+        batch_size = settings['pg_batch_size'] or pg_loader.DEFAULT_BATCH_SIZE
+        if not settings['chunk_size']:
+            # Las filas van a PostgreSQL a la vez que se escriben en el CSV
+            with pg_loader.FeatureDefinitionsSink(settings['pg_dsn'], batch_size) as sink:
+                stats = _run_engine(input_file, output_file, settings, sink)
+            stats['pg'] = sink.counts
+        else:
+            stats = _run_engine(input_file, output_file, settings)
+            stats['pg'] = pg_loader.load_clean_csv(output_file, settings['pg_dsn'], batch_size)
+    
+    if settings['snapshot']:
+        write_feature_snapshot(output_file, snapshot_path_for(output_file, settings['snapshot']))
+    return stats
+
+def snapshot_path_for(output_file, snapshot):
+    """En modo lote cada archivo lleva su snapshot junto a la salida"""
+    if snapshot is True:
+        return os.path.splitext(output_file)[0] + SNAPSHOT_SUFFIX
+    return snapshot
+
+def parse_options_value(value):
+    """Convierte la celda options (texto o JSON) en una lista de opciones"""
+    if not value:
+        return []
+    try:
+        items = json.loads(value)
+        if isinstance(items, list):
+            return items
+    except ValueError:
+        pass
+    return options_items(value)
+
+def write_feature_snapshot(clean_file, snapshot_file):
+    """Guarda un snapshot binario de feature_definitions agrupado por subcategoría.
+    
+    Se construye a partir del CSV ya corregido, así que sirve para cualquier
+    modo; las opciones quedan como listas y los números como int.
+    """
+    by_subcategory = {}
+    with open(clean_file, 'r', encoding='utf-8', newline='') as file:
+        for row in csv.DictReader(file):
+            feature = {
+                'id': int(row['id']),
+                'subcategory_id': int(row['subcategory_id']),
+                'name': row['name'],
+                'display_name': row['display_name'],
+                'type': row['type'],
+                'order_index': int(row['order_index']),
+                'options': parse_options_value(row['options']),
+                'created_at': row['created_at'],
+                'updated_at': row['updated_at'],
+                'mandatory': row['mandatory'] == 't',
+            }
+            by_subcategory.setdefault(feature['subcategory_id'], []).append(feature)
+    
+    snapshot = {
+        'version': SNAPSHOT_VERSION,
+        'source': os.path.basename(clean_file),
+        'features': sum(len(features) for features in by_subcategory.values()),
+        'by_subcategory': by_subcategory,
+    }
+    with open(snapshot_file, 'wb') as file:
+        pickle.dump(snapshot, file, protocol=pickle.HIGHEST_PROTOCOL)
+    return snapshot
+
+def load_feature_snapshot(snapshot_file):
+    """Carga un snapshot: {subcategory_id: [feature, ...]} listo para usar"""
+    with open(snapshot_file, 'rb') as file:
+        snapshot = pickle.load(file)
+    if snapshot.get('version') != SNAPSHOT_VERSION:
+        raise ValueError(f"Versión de snapshot no soportada: {snapshot.get('version')}")
+    return snapshot['by_subcategory']
+
+def process_csv_file(input_file, output_file, settings=None):
+    """Procesa el archivo CSV y genera la versión corregida"""
+    try:
+        stats = correct_file(input_file, output_file, settings)
+        print_summary(output_file, stats)
         
         print(f"\n🎯 CORRECCIONES APLICADAS:")
         print(f"   ✓ Acentos restaurados (é, á, ó, etc.)")
@@ -232,13 +727,127 @@ def process_csv_file(input_file, output_file):
         print(f"❌ Error: {e}")
         return False
 
-def main():
-    """Función principal"""
-    print("🔧 CORRECTOR DE CSV - VERSIÓN FINAL")
+def is_generated_output(path):
+    """Indica si el archivo es una salida del modo lote (*_FINAL.csv o el resumen)"""
+    name = os.path.basename(path)
+    return (name == BATCH_SUMMARY_FILE
+            or os.path.splitext(name)[0].endswith(OUTPUT_SUFFIX))
+
+def expand_inputs(patterns):
+    """Convierte directorios y globs en la lista de exportaciones a corregir"""
+    paths = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            matches = glob.glob(os.path.join(pattern, '*.csv'))
+        elif glob.has_magic(pattern):
+            matches = glob.glob(pattern)
+        else:
+            matches = [pattern]
+        
+        for path in sorted(matches):
+            # No volver a procesar salidas de corridas anteriores
+            if is_generated_output(path) and path not in patterns:
+                continue
+            if path not in paths:
+                paths.append(path)
+    return paths
+
+def output_path_for(input_file, output_dir):
+    """Nombre del archivo corregido para una exportación"""
+    stem = os.path.splitext(os.path.basename(input_file))[0]
+    return os.path.join(output_dir, f"{stem}{OUTPUT_SUFFIX}.csv")
+
+def _batch_worker(job):
+    """Corrige un archivo dentro del pool; nunca propaga excepciones"""
+    input_file, output_file, settings = job
+    start = time.perf_counter()
+    try:
+        stats = correct_file(input_file, output_file, settings)
+        stats['error'] = ''
+    except Exception as e:
+        stats = new_stats()
+        stats['error'] = str(e)
+    stats['seconds'] = time.perf_counter() - start
+    stats['input'] = input_file
+    stats['output'] = output_file
+    return stats
+
+def process_batch(input_files, output_dir, settings=None):
+    """Corrige varias exportaciones en paralelo.
+    
+    Sin chunk_size cada archivo ocupa un proceso; con chunk_size los archivos
+    se procesan uno tras otro y cada uno se reparte entre todos los procesos.
+    Con carga a PostgreSQL también van uno tras otro, una transacción por archivo.
+    """
+    settings = settings or new_settings()
+    sequential = settings['chunk_size'] or settings['pg_dsn']
+    os.makedirs(output_dir, exist_ok=True)
+    jobs = [(path, output_path_for(path, output_dir), settings) for path in input_files]
+    
+    results = []
+    if sequential:
+        outcomes = map(_batch_worker, jobs)
+    else:
+        pool = ProcessPoolExecutor(max_workers=settings['workers'])
+        outcomes = pool.map(_batch_worker, jobs)
+    
+    for stats in outcomes:
+        results.append(stats)
+        if stats['error']:
+            print(f"   ❌ {stats['input']}: {stats['error']}")
+        else:
+            print(f"   ✓ {stats['input']} → {stats['output']} "
+                  f"({stats['rows']} filas, {stats['seconds']:.2f}s)")
+            if 'changes' in stats:
+                changes = stats['changes']
+                print(f"     🔄 {len(changes['new'])} nuevas, {len(changes['modified'])} "
+                      f"modificadas, {len(changes['removed'])} eliminadas, "
+                      f"{changes['unchanged']} sin cambios")
+    
+    if not sequential:
+        pool.shutdown()
+    
+    write_batch_summary(results, os.path.join(output_dir, BATCH_SUMMARY_FILE))
+    return results
+
+def write_batch_summary(results, summary_file):
+    """Guarda el resumen combinado de un lote"""
+    fieldnames = ['input', 'output', 'lines', 'rows', 'with_accents', 'seconds', 'error']
+    with open(summary_file, 'w', encoding='utf-8', newline='') as file:
+        writer = csv.DictWriter(file, fieldnames=fieldnames, extrasaction='ignore')
+        writer.writeheader()
+        for stats in results:
+            writer.writerow(dict(stats, seconds=f"{stats['seconds']:.3f}"))
+
+def run_batch(patterns, output_dir, settings=None):
+    """Modo lote: muchas exportaciones, un archivo corregido por cada una"""
+    print("🔧 CORRECTOR DE CSV - MODO LOTE")
     print("=" * 50)
     
-    input_file = 'feature_client.csv'
-    output_file = 'feature_def_FINAL.csv'
+    input_files = expand_inputs(patterns)
+    if not input_files:
+        print("❌ Error: No se encontraron archivos CSV para procesar")
+        return False
+    
+    print(f"📁 Archivos de entrada: {len(input_files)}")
+    print(f"📁 Directorio de salida: {output_dir}")
+    print()
+    
+    results = process_batch(input_files, output_dir, settings)
+    failed = [stats for stats in results if stats['error']]
+    
+    print("\n📊 RESUMEN DEL LOTE:")
+    print(f"   Archivos procesados: {len(results) - len(failed)}/{len(results)}")
+    print(f"   Total de registros: {sum(stats['rows'] for stats in results)}")
+    print(f"   Registros con acentos: {sum(stats['with_accents'] for stats in results)}")
+    print(f"   Resumen guardado: {os.path.join(output_dir, BATCH_SUMMARY_FILE)}")
+    
+    return not failed
+
+def run_single(input_file, output_file, settings=None):
+    """Modo original: un archivo de entrada y uno de salida"""
+    print("🔧 CORRECTOR DE CSV - VERSIÓN FINAL")
+    print("=" * 50)
     
     # Verificar que existe el archivo de entrada
     try:
@@ -247,14 +856,14 @@ def main():
     except FileNotFoundError:
         print(f"❌ Error: No se encontró el archivo '{input_file}'")
         print("   Asegúrate de que el archivo esté en el mismo directorio")
-        return
+        return False
     
     print(f"📁 Archivo de entrada: {input_file}")
     print(f"📁 Archivo de salida: {output_file}")
     print()
     
     # Procesar archivo
-    success = process_csv_file(input_file, output_file)
+    success = process_csv_file(input_file, output_file, settings)
     
     if success:
         print(f"\n🎉 ¡Proceso completado exitosamente!")
@@ -262,6 +871,68 @@ def main():
         print(f"   Ya puedes usarlo en tu base de datos ✨")
     else:
         print(f"\n💥 Proceso falló. Revisa los errores arriba.")
+    
+    return success
+
+def _resolve_pg_dsn(value):
+    """--pg-dsn sin valor usa el DSN por defecto de pg_loader"""
+    if value is None:
+        return None
+    if value:
+        return value
+    import pg_loader
+    return pg_loader.DEFAULT_DSN
+
+def main():
+    """Función principal"""
+    parser = argparse.ArgumentParser(
+        description='Corrige exportaciones de feature_definitions')
+    parser.add_argument('inputs', nargs='*',
+                        help='Archivos, directorios o globs a corregir en lote '
+                             '(sin argumentos: feature_client.csv → feature_def_FINAL.csv)')
+    parser.add_argument('-o', '--output-dir', default=DEFAULT_OUTPUT_DIR,
+                        help='Directorio para los archivos corregidos en modo lote')
+    parser.add_argument('-j', '--workers', type=int, default=None,
+                        help='Procesos en paralelo (por defecto, uno por núcleo)')
+    parser.add_argument('--chunk-mb', type=float, default=None,
+                        help='Reparte cada archivo en rangos de este tamaño (MB) '
+                             'entre los procesos; útil para exportaciones muy grandes')
+    parser.add_argument('--options-format', choices=OPTIONS_FORMATS, default='texto',
+                        help='texto: lista estilo Python (por defecto); '
+                             'json: arreglo JSON canónico, listo para la columna jsonb')
+    parser.add_argument('--snapshot', nargs='?', const=True, default=None,
+                        help='Guarda también un snapshot binario (pickle) agrupado por '
+                             'subcategory_id; en modo lote se crea uno por archivo')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Reprocesa sólo las filas nuevas o modificadas desde la '
+                             'corrida anterior (usa un manifest junto a la salida)')
+    parser.add_argument('--pg-dsn', nargs='?', const='', default=None,
+                        help='Carga además las filas en feature_definitions con COPY + '
+                             'upsert en una transacción (sin valor: DATABASE_URL o la '
+                             'base local de docker-compose)')
+    parser.add_argument('--pg-batch', type=int, default=None,
+                        help='Filas por cada COPY al cargar en PostgreSQL')
+    args = parser.parse_args()
+    
+    if args.incremental and args.chunk_mb:
+        parser.error('--incremental no se combina con --chunk-mb')
+    
+    settings = new_settings(
+        workers=args.workers,
+        chunk_size=int(args.chunk_mb * 1024 * 1024) if args.chunk_mb else None,
+        options_format=args.options_format,
+        snapshot=True if (args.snapshot and args.inputs) else args.snapshot,
+        incremental=args.incremental,
+        pg_dsn=_resolve_pg_dsn(args.pg_dsn),
+        pg_batch_size=args.pg_batch,
+    )
+    
+    if args.inputs:
+        success = run_batch(args.inputs, args.output_dir, settings)
+    else:
+        success = run_single('feature_client.csv', 'feature_def_FINAL.csv', settings)
+    
+    sys.exit(0 if success else 1)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
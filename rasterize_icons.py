@@ -0,0 +1,388 @@
+#!/usr/bin/env python3
+"""Rasterize the Entrepeques icons to PNG/WebP and pack them into atlases.
+
+The renderer is pure Python (scanline fill with the nonzero rule, 4 vertical
+samples per pixel and exact horizontal coverage), so it runs anywhere the
+extractors run. PNG is encoded with zlib from the standard library; WebP
+needs Pillow (pip install Pillow) and is skipped with a warning without it.
+
+Icons are rendered in parallel, one job per (icon, size), with a process
+pool. For every size an atlas image is written with a JSON map of where
+each icon sits:
+
+    python rasterize_icons.py --sizes 24,48,96 --formats png,webp
+
+    apps/tienda/public/icons/raster/ep-toys-24.png
+    apps/tienda/public/icons/raster/ep-atlas-24.png
+    apps/tienda/public/icons/raster/ep-atlas-24.json
+"""
+import argparse
+import json
+import math
+import os
+import struct
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from pathlib import Path
+
+from icon_library import GRID, SOURCES, library, parse_path
+
+try:
+    from PIL import Image
+except ImportError:  # optional, only needed for WebP
+    Image = None
+
+OUTPUT_DIR = 'apps/tienda/public/icons/raster'
+DEFAULT_SIZES = (24, 48, 96)
+DEFAULT_FORMATS = ('png',)
+DEFAULT_COLOR = '#000000'
+SAMPLES = 4  # sub-scanlines per pixel row
+ATLAS_PADDING = 1
+
+
+# ---------- Geometry ----------
+
+def _cubic(points, p0, p1, p2, p3, steps):
+    for i in range(1, steps + 1):
+        t = i / steps
+        mt = 1 - t
+        a, b, c, d = mt * mt * mt, 3 * mt * mt * t, 3 * mt * t * t, t * t * t
+        points.append((a * p0[0] + b * p1[0] + c * p2[0] + d * p3[0],
+                       a * p0[1] + b * p1[1] + c * p2[1] + d * p3[1]))
+
+
+def _quad(points, p0, p1, p2, steps):
+    for i in range(1, steps + 1):
+        t = i / steps
+        mt = 1 - t
+        a, b, c = mt * mt, 2 * mt * t, t * t
+        points.append((a * p0[0] + b * p1[0] + c * p2[0],
+                       a * p0[1] + b * p1[1] + c * p2[1]))
+
+
+def _steps(scale, *points):
+    """Segments for a curve: about one every 2px of control polygon length."""
+    length = sum(math.dist(points[i], points[i + 1]) for i in range(len(points) - 1)) * scale
+    return max(2, min(64, math.ceil(length / 2)))
+
+
+def _arc(points, p0, rx, ry, angle, large, sweep, p1, scale):
+    """Endpoint arc to polyline (SVG implementation notes, F.6.5)."""
+    if p0 == p1:
+        return
+    rx, ry = abs(rx), abs(ry)
+    if not rx or not ry:
+        points.append(p1)
+        return
+    phi = math.radians(angle)
+    cos_phi, sin_phi = math.cos(phi), math.sin(phi)
+    dx, dy = (p0[0] - p1[0]) / 2, (p0[1] - p1[1]) / 2
+    x1 = cos_phi * dx + sin_phi * dy
+    y1 = -sin_phi * dx + cos_phi * dy
+    radii = x1 * x1 / (rx * rx) + y1 * y1 / (ry * ry)
+    if radii > 1:
+        rx, ry = rx * math.sqrt(radii), ry * math.sqrt(radii)
+    numerator = rx * rx * ry * ry - rx * rx * y1 * y1 - ry * ry * x1 * x1
+    factor = math.sqrt(max(0.0, numerator / (rx * rx * y1 * y1 + ry * ry * x1 * x1)))
+    if large == sweep:
+        factor = -factor
+    cx1, cy1 = factor * rx * y1 / ry, -factor * ry * x1 / rx
+    cx = cos_phi * cx1 - sin_phi * cy1 + (p0[0] + p1[0]) / 2
+    cy = sin_phi * cx1 + cos_phi * cy1 + (p0[1] + p1[1]) / 2
+
+    def angle_of(ux, uy):
+        return math.atan2(uy, ux)
+
+    start = angle_of((x1 - cx1) / rx, (y1 - cy1) / ry)
+    delta = angle_of((-x1 - cx1) / rx, (-y1 - cy1) / ry) - start
+    if sweep and delta < 0:
+        delta += 2 * math.pi
+    elif not sweep and delta > 0:
+        delta -= 2 * math.pi
+
+    steps = max(2, min(64, math.ceil(abs(delta) * max(rx, ry) * scale / 2)))
+    for i in range(1, steps + 1):
+        theta = start + delta * i / steps
+        x, y = rx * math.cos(theta), ry * math.sin(theta)
+        points.append((cos_phi * x - sin_phi * y + cx, sin_phi * x + cos_phi * y + cy))
+
+
+def flatten(segments, scale):
+    """Absolute path segments -> closed polylines in pixel coordinates."""
+    polylines = []
+    points = []
+    start = current = (0.0, 0.0)
+    control = None  # last control point, for S/T reflection
+    previous = None
+
+    for command, args in segments:
+        if command == 'M':
+            if len(points) > 1:
+                polylines.append(points)
+            start = current = (args[0], args[1])
+            points = [current]
+        elif command == 'Z':
+            points.append(start)
+            if len(points) > 1:
+                polylines.append(points)
+            current = start
+            points = [current]
+        elif command == 'L':
+            current = (args[0], args[1])
+            points.append(current)
+        elif command == 'H':
+            current = (args[0], current[1])
+            points.append(current)
+        elif command == 'V':
+            current = (current[0], args[0])
+            points.append(current)
+        elif command in 'CS':
+            if command == 'C':
+                c1 = (args[0], args[1])
+                rest = args[2:]
+            else:
+                c1 = ((2 * current[0] - control[0], 2 * current[1] - control[1])
+                      if previous in 'CS' else current)
+                rest = args
+            c2, end = (rest[0], rest[1]), (rest[2], rest[3])
+            _cubic(points, current, c1, c2, end, _steps(scale, current, c1, c2, end))
+            control, current = c2, end
+        elif command in 'QT':
+            if command == 'Q':
+                c1, end = (args[0], args[1]), (args[2], args[3])
+            else:
+                c1 = ((2 * current[0] - control[0], 2 * current[1] - control[1])
+                      if previous in 'QT' else current)
+                end = (args[0], args[1])
+            _quad(points, current, c1, end, _steps(scale, current, c1, end))
+            control, current = c1, end
+        elif command == 'A':
+            end = (args[5], args[6])
+            _arc(points, current, args[0], args[1], args[2], args[3], args[4], end, scale)
+            current = end
+        previous = command
+
+    if len(points) > 1:
+        polylines.append(points)
+    return [[(x * scale, y * scale) for x, y in polyline] for polyline in polylines]
+
+
+# ---------- Rasterizer ----------
+
+def rasterize(paths, size):
+    """Coverage (0..1 floats, row-major) of the union of paths at size x size."""
+    scale = size / GRID
+    edges = []
+    for d in paths:
+        for polyline in flatten(parse_path(d), scale):
+            # Fill closes every subpath implicitly
+            for (x0, y0), (x1, y1) in zip(polyline, polyline[1:] + polyline[:1]):
+                if y0 == y1:
+                    continue
+                winding = 1 if y1 > y0 else -1
+                if y0 > y1:
+                    x0, y0, x1, y1 = x1, y1, x0, y0
+                edges.append((y0, y1, x0, (x1 - x0) / (y1 - y0), winding))
+    edges.sort()
+
+    coverage = [0.0] * (size * size)
+    weight = 1 / SAMPLES
+    active = []
+    next_edge = 0
+    for row in range(size):
+        cells = [0.0] * (size + 1)   # partial coverage of each pixel
+        cover = [0.0] * (size + 2)   # difference array for fully covered runs
+        for sample in range(SAMPLES):
+            y = row + (sample + 0.5) / SAMPLES
+            while next_edge < len(edges) and edges[next_edge][0] <= y:
+                active.append(edges[next_edge])
+                next_edge += 1
+            active = [edge for edge in active if edge[1] > y]
+
+            crossings = sorted((x0 + (y - y0) * slope, winding)
+                               for y0, y1, x0, slope, winding in active if y0 <= y)
+            winding = 0
+            for i, (x, direction) in enumerate(crossings[:-1]):
+                winding += direction
+                if not winding:
+                    continue
+                xa, xb = max(x, 0.0), min(crossings[i + 1][0], float(size))
+                if xb <= xa:
+                    continue
+                ia, ib = int(xa), int(xb)
+                if ia == ib:
+                    cells[ia] += (xb - xa) * weight
+                    continue
+                cells[ia] += (ia + 1 - xa) * weight
+                cover[ia + 1] += weight
+                cover[ib] -= weight
+                if ib < size:
+                    cells[ib] += (xb - ib) * weight
+
+        run = 0.0
+        base = row * size
+        for column in range(size):
+            run += cover[column]
+            coverage[base + column] = min(1.0, run + cells[column])
+    return coverage
+
+
+def to_rgba(coverage, color):
+    """Straight-alpha RGBA bytes of one color, alpha = coverage."""
+    red, green, blue = color
+    pixels = bytearray(len(coverage) * 4)
+    for i, alpha in enumerate(coverage):
+        pixels[i * 4:i * 4 + 4] = bytes((red, green, blue, round(alpha * 255)))
+    return bytes(pixels)
+
+
+def parse_color(text):
+    text = text.lstrip('#')
+    if len(text) == 3:
+        text = ''.join(c * 2 for c in text)
+    return tuple(int(text[i:i + 2], 16) for i in (0, 2, 4))
+
+
+# ---------- Encoders ----------
+
+def encode_png(rgba, width, height):
+    """Minimal RGBA PNG (filter 0 on every row), standard library only."""
+    def chunk(kind, data):
+        return (struct.pack('>I', len(data)) + kind + data
+                + struct.pack('>I', zlib.crc32(kind + data) & 0xFFFFFFFF))
+
+    stride = width * 4
+    raw = b''.join(b'\0' + rgba[y * stride:(y + 1) * stride] for y in range(height))
+    return (b'\x89PNG\r\n\x1a\n'
+            + chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 6, 0, 0, 0))
+            + chunk(b'IDAT', zlib.compress(raw, 9))
+            + chunk(b'IEND', b''))
+
+
+def encode_webp(rgba, width, height):
+    buffer = BytesIO()
+    Image.frombytes('RGBA', (width, height), rgba).save(buffer, 'WEBP', lossless=True)
+    return buffer.getvalue()
+
+
+ENCODERS = {'png': encode_png, 'webp': encode_webp}
+
+
+def _render_job(job):
+    """Worker: render one icon at one size and encode it in every format."""
+    name, paths, size, color, formats = job
+    rgba = to_rgba(rasterize(paths, size), color)
+    return name, size, rgba, {fmt: ENCODERS[fmt](rgba, size, size) for fmt in formats}
+
+
+# ---------- Atlas ----------
+
+def pack_shelves(sizes, padding=ATLAS_PADDING):
+    """Shelf packing of (name, width, height) into a roughly square sheet.
+
+    Returns (width, height, {name: (x, y, w, h)}).
+    """
+    area = sum((w + padding) * (h + padding) for _, w, h in sizes)
+    max_width = max(max(w for _, w, _ in sizes) + padding, math.ceil(math.sqrt(area)))
+    placements = {}
+    x = y = shelf_height = sheet_width = 0
+    for name, w, h in sorted(sizes, key=lambda item: (-item[2], item[0])):
+        if x and x + w + padding > max_width:
+            y += shelf_height
+            x = shelf_height = 0
+        placements[name] = (x + padding, y + padding, w, h)
+        x += w + padding
+        shelf_height = max(shelf_height, h + padding)
+        sheet_width = max(sheet_width, x + padding)
+    return sheet_width, y + shelf_height + padding, placements
+
+
+def build_atlas(images, padding=ATLAS_PADDING):
+    """Compose {name: (rgba, w, h)} into one RGBA sheet + coordinate map."""
+    width, height, placements = pack_shelves(
+        [(name, w, h) for name, (_, w, h) in images.items()], padding)
+    sheet = bytearray(width * height * 4)
+    for name, (x, y, w, h) in placements.items():
+        rgba = images[name][0]
+        for row in range(h):
+            offset = ((y + row) * width + x) * 4
+            sheet[offset:offset + w * 4] = rgba[row * w * 4:(row + 1) * w * 4]
+    return bytes(sheet), width, height, placements
+
+
+# ---------- Driver ----------
+
+def load_icons(source='selection'):
+    return [(icon.english_name, icon.paths) for icon in library(source)]
+
+
+def rasterize_icons(sizes=DEFAULT_SIZES, formats=DEFAULT_FORMATS, color=DEFAULT_COLOR,
+                    workers=None, output_dir=OUTPUT_DIR, source='selection'):
+    if 'webp' in formats and Image is None:
+        print("⚠️  WebP needs Pillow (pip install Pillow); writing PNG only")
+        formats = tuple(fmt for fmt in formats if fmt != 'webp') or ('png',)
+
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    rgb = parse_color(color)
+    icons = load_icons(source)
+    jobs = [(name, paths, size, rgb, formats) for size in sizes for name, paths in icons]
+
+    by_size = {size: {} for size in sizes}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # Bigger icons first so the pool doesn't end waiting on one slow job
+        jobs.sort(key=lambda job: -job[2])
+        for name, size, rgba, encoded in pool.map(_render_job, jobs):
+            by_size[size][name] = (rgba, size, size)
+            for fmt, data in encoded.items():
+                with open(output_dir / f"ep-{name}-{size}.{fmt}", 'wb') as f:
+                    f.write(data)
+
+    print(f"🖼️  Rendered {len(icons)} icons x {len(sizes)} sizes ({', '.join(formats)}) to {output_dir}")
+
+    for size in sizes:
+        sheet, width, height, placements = build_atlas(by_size[size])
+        stem = f"ep-atlas-{size}"
+        for fmt in formats:
+            with open(output_dir / f"{stem}.{fmt}", 'wb') as f:
+                f.write(ENCODERS[fmt](sheet, width, height))
+        atlas_map = {
+            'image': f"{stem}.{formats[0]}",
+            'formats': list(formats),
+            'width': width,
+            'height': height,
+            'icons': {name: {'x': x, 'y': y, 'w': w, 'h': h}
+                      for name, (x, y, w, h) in sorted(placements.items())},
+        }
+        with open(output_dir / f"{stem}.json", 'w', encoding='utf-8') as f:
+            json.dump(atlas_map, f, indent=2)
+            f.write('\n')
+        print(f"🧱 Atlas {stem}: {width}x{height}, map at {output_dir}/{stem}.json")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rasterize the Entrepeques icons to PNG/WebP + atlases")
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)),
+                        help="comma-separated pixel sizes (default %(default)s)")
+    parser.add_argument('--formats', default=','.join(DEFAULT_FORMATS),
+                        help="comma-separated: png, webp (default %(default)s)")
+    parser.add_argument('--color', default=DEFAULT_COLOR, help="fill color (default %(default)s)")
+    parser.add_argument('-j', '--workers', type=int, default=None,
+                        help="worker processes (default: one per CPU)")
+    parser.add_argument('-o', '--output-dir', default=OUTPUT_DIR)
+    parser.add_argument('--source', choices=sorted(SOURCES), default='selection',
+                        help="icon source: selection.json or the SVG font (default %(default)s)")
+    args = parser.parse_args()
+
+    formats = tuple(fmt.strip().lower() for fmt in args.formats.split(',') if fmt.strip())
+    unknown = [fmt for fmt in formats if fmt not in ENCODERS]
+    if unknown:
+        parser.error(f"unknown format(s): {', '.join(unknown)}")
+    sizes = tuple(int(size) for size in args.sizes.split(',') if size.strip())
+    rasterize_icons(sizes, formats, args.color, args.workers or os.cpu_count(), args.output_dir,
+                    args.source)
+
+
+if __name__ == "__main__":
+    main()
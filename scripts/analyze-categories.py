@@ -1,21 +1,11 @@
 #!/usr/bin/env python3
-import csv
-from collections import defaultdict
+from catalog_index import load_catalog_index
+from subcategory_registry import load_registry
 
-categories = set()
-subcategories = defaultdict(set)
-
-with open('productos_old_store.csv', 'r', encoding='utf-8-sig') as f:
-    reader = csv.DictReader(f)
-    for row in reader:
-        cat_str = row.get('Categorías', '').strip()
-        if cat_str and '>' in cat_str:
-            parts = [p.strip() for p in cat_str.split('>')]
-            if len(parts) >= 2:
-                category = parts[0]
-                subcategory = parts[1]
-                categories.add(category)
-                subcategories[category].add(subcategory)
+index = load_catalog_index('productos_old_store.csv')
+categories = index.categories
+subcategories = index.subcategories
+registry = load_registry()
 
 print('=' * 70)
 print('ANÁLISIS DE CATEGORÍAS Y SUBCATEGORÍAS EN EL CSV')
@@ -25,11 +15,17 @@ print()
 for category in sorted(categories):
     print(f'\n📁 {category}')
     for sub in sorted(subcategories[category]):
-        print(f'   └─ {sub}')
+        print(f'   └─ {sub} ({index.count(category, sub)} productos)')
+        if '?' in sub:
+            subcategory_id, confidence = registry.resolve(sub, category)
+            resolved = registry.name_for(subcategory_id) or 'sin coincidencia'
+            print(f'      ↳ {resolved} (confianza {confidence:.2f})')
 
 print()
 print('=' * 70)
 print(f'Total categorías: {len(categories)}')
 total_subs = sum(len(subs) for subs in subcategories.values())
 print(f'Total subcategorías: {total_subs}')
+multi = sum(1 for paths in index.paths if len(paths) > 1)
+print(f'Productos en más de una subcategoría: {multi}')
 print('=' * 70)
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Índice reutilizable del catálogo de la tienda anterior (productos_old_store.csv).
+
+Lee el export de WooCommerce una sola vez y construye:
+- SKU -> nombre del producto
+- SKU <-> (categoría, subcategoría), muchos a muchos
+- categoría -> subcategoría -> SKUs
+- conteo de productos por (categoría, subcategoría)
+
+Un producto puede estar en varias rutas, p. ej.
+"A dormir > Cunas de madera, A Jugar > Juegos grandes"; todas se indexan.
+
+El índice se guarda en un caché binario junto al CSV y se invalida cuando
+cambia el archivo (tamaño/fecha y, si difieren, el hash del contenido), así
+que los scripts de análisis lo cargan al instante en corridas repetidas.
+El caché sólo guarda lo que usan los scripts (SKU, Nombre y rutas de cada
+producto); los mapas se reconstruyen al cargarlo.
+
+Uso:
+    from catalog_index import load_catalog_index
+    index = load_catalog_index('productos_old_store.csv')
+"""
+
+import csv
+import hashlib
+import os
+import pickle
+import sys
+
+DEFAULT_CSV = 'productos_old_store.csv'
+CACHE_SUFFIX = '.index.pickle'
+CACHE_VERSION = 3
+
+# WooCommerce separa rutas con ',' y escapa las comas de los nombres con '\,'
+_ESCAPED_COMMA = '\x00'
+
+
+def split_category_cell(cat_str):
+    """Separa la celda 'Categorías' en rutas, cada una como lista de niveles."""
+    cat_str = (cat_str or '').replace('\\,', _ESCAPED_COMMA)
+    paths = []
+    for raw_path in cat_str.split(','):
+        levels = [level.strip().replace(_ESCAPED_COMMA, ',') for level in raw_path.split('>')]
+        levels = [level for level in levels if level]
+        if levels:
+            paths.append(levels)
+    return paths
+
+
+def category_paths(cat_str):
+    """Devuelve todas las rutas (categoría, subcategoría) de la celda 'Categorías'.
+
+    La subcategoría es el último nivel de la ruta, así que
+    "En casa > Hogar > Sillas para comer" queda como
+    ('En casa', 'Sillas para comer'). Las entradas de un solo nivel
+    (WooCommerce también lista el padre o la hoja sueltos) se ignoran porque
+    la ruta completa ya aparece en la misma celda. Sin duplicados y en orden.
+    """
+    paths = []
+    for levels in split_category_cell(cat_str):
+        if len(levels) < 2:
+            continue
+        # Nombres internados: en el caché cada nombre se guarda una sola vez
+        path = (sys.intern(levels[0]), sys.intern(levels[-1]))
+        if path not in paths:
+            paths.append(path)
+    return paths
+
+
+def product_fields(row):
+    """Campos del export que usan los scripts: (SKU, Nombre, rutas)."""
+    return (row.get('SKU', '').strip(), row.get('Nombre', ''),
+            tuple(category_paths(row.get('Categorías', ''))))
+
+
+class CatalogIndex:
+    """Índices en memoria sobre los productos del export.
+
+    products es una lista de (SKU, Nombre, rutas), en el orden del CSV.
+    Sólo esa lista viaja en el caché; los mapas se reconstruyen al cargarlo.
+    """
+
+    def __init__(self, source, products):
+        self.source = source
+        self.products = products
+        self._build()
+
+    def _build(self):
+        self.names = {}
+        self.paths_by_sku = {}
+        self.paths = [paths for _, _, paths in self.products]
+        self.subcategories = {}
+        self.product_counts = {}
+
+        for sku, name, paths in self.products:
+            if sku:
+                self.names[sku] = name
+                self.paths_by_sku[sku] = frozenset(paths)
+
+            for category, subcategory in paths:
+                skus = self.subcategories.setdefault(category, {}).setdefault(subcategory, [])
+                if sku:
+                    skus.append(sku)
+                key = (category, subcategory)
+                self.product_counts[key] = self.product_counts.get(key, 0) + 1
+
+    def __getstate__(self):
+        return {'source': self.source, 'products': self.products}
+
+    def __setstate__(self, state):
+        self.source = state['source']
+        self.products = state['products']
+        self._build()
+
+    @property
+    def categories(self):
+        return set(self.subcategories)
+
+    def skus(self, category, subcategory):
+        """SKUs de una subcategoría."""
+        return self.subcategories.get(category, {}).get(subcategory, [])
+
+    def count(self, category, subcategory):
+        """Productos en una subcategoría."""
+        return self.product_counts.get((category, subcategory), 0)
+
+    def paths_of(self, sku):
+        """Rutas (categoría, subcategoría) de un SKU."""
+        return self.paths_by_sku.get(sku, frozenset())
+
+    def in_subcategory(self, sku, category, subcategory):
+        """Indica si el SKU aparece en esa subcategoría (en cualquiera de sus rutas)."""
+        return (category, subcategory) in self.paths_by_sku.get(sku, ())
+
+    def name_of(self, sku):
+        """Nombre del producto con ese SKU ('' si no aparece)."""
+        return self.names.get(sku, '')
+
+    def iter_products(self):
+        """Genera (SKU, Nombre, rutas) para cada producto del export."""
+        return iter(self.products)
+
+
+def file_digest(path):
+    """SHA-1 del contenido del archivo, leído por bloques."""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def build_catalog_index(csv_path=DEFAULT_CSV):
+    """Lee el CSV y construye el índice (sin usar el caché)."""
+    with open(csv_path, 'r', encoding='utf-8-sig') as f:
+        products = [product_fields(row) for row in csv.DictReader(f)]
+    return CatalogIndex(os.path.basename(csv_path), products)
+
+
+def _read_cache(cache_path):
+    try:
+        with open(cache_path, 'rb') as f:
+            cache = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, KeyError):
+        # KeyError: caché de una versión anterior del índice
+        return None
+    if not isinstance(cache, dict) or cache.get('version') != CACHE_VERSION:
+        return None
+    return cache
+
+
+def _write_cache(cache_path, cache):
+    tmp_path = cache_path + '.tmp'
+    try:
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(cache, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        # Sin caché el índice sigue sirviendo; sólo se pierde la aceleración
+        print(f"⚠️  No se pudo guardar el caché del catálogo: {e}")
+
+
+def load_catalog_index(csv_path=DEFAULT_CSV, use_cache=True):
+    """Carga el índice desde el caché o lo reconstruye si el CSV cambió."""
+    if not use_cache:
+        return build_catalog_index(csv_path)
+
+    cache_path = csv_path + CACHE_SUFFIX
+    stat = os.stat(csv_path)
+    stamp = (stat.st_mtime_ns, stat.st_size)
+
+    cache = _read_cache(cache_path)
+    if cache and cache['stamp'] == stamp:
+        return cache['index']
+
+    # Fecha distinta pero mismo contenido (p. ej. un checkout): reusar
+    digest = file_digest(csv_path)
+    if cache and cache['sha1'] == digest:
+        cache['stamp'] = stamp
+        _write_cache(cache_path, cache)
+        return cache['index']
+
+    index = build_catalog_index(csv_path)
+    _write_cache(cache_path, {
+        'version': CACHE_VERSION,
+        'stamp': stamp,
+        'sha1': digest,
+        'index': index,
+    })
+    return index
@@ -1,63 +1,37 @@
 #!/usr/bin/env python3
-import csv
 from collections import defaultdict
 
-# Mapeo del script de migración (migrate-old-store-products.js líneas 26-53)
-script_mapping = {
-    # A pasear
-    'Autoasientos': 1,
-    'Carriolas': 3,
-    'Otros de Paseo': 9,
-
-    # A dormir
-    'Cunas de madera': 10,
-    'Cunas de viaje': 12,
-    'Muebles de recámara': 18,
-    'Almohadas y donas': 15,
-
-    # En casa
-    'Sillas para comer': 20,
-    'Brincolines': 22,
-    'Monitores': 26,
-    'Higiene y accesorios': 27,
-
-    # A comer
-    'Lactancia': 30,
-    'Calentador de biberones': 31,
-
-    # A jugar
-    'Juguetes': 46,
-    'Juegos grandes': 57,
-    'Montables y correpasillos Bebé': 53,
-    'Gimnasios y tapetes': 51
-}
-
-# Extraer subcategorías del CSV
+from catalog_index import load_catalog_index
+from subcategory_registry import load_registry
+
+# Registro de subcategorías (data/subcategories.csv, cacheado en disco)
+registry = load_registry()
+
+# Extraer subcategorías del CSV (índice compartido, cacheado en disco)
 csv_subcategories = defaultdict(set)
 product_counts = defaultdict(int)
 
-with open('productos_old_store.csv', 'r', encoding='utf-8-sig') as f:
-    reader = csv.DictReader(f)
-    for row in reader:
-        cat_str = row.get('Categorías', '').strip()
-        if cat_str and '>' in cat_str:
-            parts = [p.strip() for p in cat_str.split('>')]
-            if len(parts) >= 2:
-                category = parts[0]
-                subcategory = parts[1]
-
-                # Normalizar algunas variantes
-                if '?' in subcategory:  # Caracteres mal codificados
-                    continue
-                if category not in ['A pasear', 'A dormir', 'A comer', 'A Jugar', 'En casa', 'Baño', 'Ropa']:
-                    continue  # Saltar categorías malformadas
-
-                csv_subcategories[category].add(subcategory)
-                key = f"{category} > {subcategory}"
-                product_counts[key] += 1
+index = load_catalog_index('productos_old_store.csv')
+for category, subs in index.subcategories.items():
+    if category not in ['A pasear', 'A dormir', 'A comer', 'A Jugar', 'En casa', 'Baño', 'Ropa']:
+        continue  # Saltar categorías malformadas
+
+    for subcategory in subs:
+        count = index.count(category, subcategory)
+
+        # Caracteres mal codificados: sumar al nombre que resuelve el registro
+        if '?' in subcategory:
+            subcategory_id, confidence = registry.resolve(subcategory, category)
+            if subcategory_id is None:
+                continue
+            subcategory = registry.name_for(subcategory_id)
+
+        csv_subcategories[category].add(subcategory)
+        key = f"{category} > {subcategory}"
+        product_counts[key] += count
 
 print('=' * 80)
-print('COMPARACIÓN: SUBCATEGORÍAS EN CSV vs MAPEO DEL SCRIPT')
+print('COMPARACIÓN: SUBCATEGORÍAS EN CSV vs REGISTRO DE SUBCATEGORÍAS')
 print('=' * 80)
 print()
 
@@ -73,7 +47,7 @@ for category in sorted(csv_subcategories.keys()):
 
     for sub in subs:
         count = product_counts[f"{category} > {sub}"]
-        if sub in script_mapping:
+        if registry.id_for(sub, category) is not None:
             status = '✅ MAPEADA'
             mapped.append((sub, count))
         else:
@@ -91,17 +65,17 @@ print('RESUMEN GENERAL')
 print('=' * 80)
 
 total_csv = sum(len(subs) for subs in csv_subcategories.values())
-total_mapped = len(script_mapping)
+total_mapped = len(registry)
 all_missing = []
 
 for category in csv_subcategories:
     for sub in csv_subcategories[category]:
-        if sub not in script_mapping:
+        if registry.id_for(sub, category) is None:
             count = product_counts[f"{category} > {sub}"]
             all_missing.append((category, sub, count))
 
 print(f'\n📊 Subcategorías en CSV: {total_csv}')
-print(f'📊 Subcategorías en mapeo del script: {total_mapped}')
+print(f'📊 Subcategorías en el registro: {total_mapped}')
 print(f'⚠️  Subcategorías FALTANTES: {len(all_missing)}')
 print(f'⚠️  Productos afectados: {sum(c for _, _, c in all_missing)}')
 
@@ -0,0 +1,424 @@
+#!/usr/bin/env python3
+"""
+Análisis columnar de revision_inventario_online_completo.csv.
+
+Lee el export de revisión una sola vez y guarda cada columna como arreglo
+de NumPy con su tipo (enteros, flotantes, fechas datetime64 y columnas de
+texto repetitivas como códigos enteros). Sobre esas columnas calcula en
+bloque, sin recorrer filas:
+- existencias por subcategoría (productos y unidades en bodega)
+- diferencia entre precio_online y precio_sugerido_original
+- días entre fecha_valuacion y fecha_publicacion
+- productos con menos fotos de las esperadas
+
+Cada agregado se guarda en memoria por rebanada (categoría, subcategoría,
+estado, marca...), así que un reporte por cada categoría o una segunda
+consulta de la misma rebanada no vuelven a leer ni a recorrer el CSV.
+
+Uso:
+    python revision_analytics.py
+    python revision_analytics.py --categoria "A pasear" --estado "BAJO STOCK"
+    python revision_analytics.py --por-categoria
+    python revision_analytics.py --condicion bueno --as-of 2025-09-01
+
+    from revision_analytics import load_revision
+    inventory = load_revision()
+    inventory.stock_by_subcategory(categoria='A jugar')
+    inventory.price_deltas(estado='DISPONIBLE')
+
+Requiere NumPy (pip install numpy).
+"""
+
+import argparse
+import csv
+import os
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - dependencia opcional
+    np = None
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CSV = os.path.join(SCRIPTS_DIR, '..', 'revision_inventario_online_completo.csv')
+
+# Fotos esperadas por producto publicado (se puede cambiar con --min-fotos)
+MIN_FOTOS = 3
+
+# Columnas de texto con pocos valores distintos: se guardan como códigos
+CATEGORICAL_COLUMNS = ('subcategoria', 'categoria', 'marca', 'condicion', 'ubicacion',
+                       'modalidad', 'estado')
+# Columnas por las que se puede rebanar el inventario
+SLICE_COLUMNS = CATEGORICAL_COLUMNS
+
+
+def _require_numpy():
+    if np is None:
+        raise RuntimeError("El análisis columnar requiere NumPy: pip install numpy")
+
+
+def _parse_date(value):
+    """'16/08/2025' -> '2025-08-16'; vacía o inválida -> 'NaT'."""
+    parts = value.strip().split('/')
+    if len(parts) != 3 or not all(part.isdigit() for part in parts):
+        return 'NaT'
+    day, month, year = parts
+    return f'{year}-{int(month):02d}-{int(day):02d}'
+
+
+def _numbers(values, dtype):
+    """Texto -> arreglo numérico; las celdas vacías o inválidas quedan en NaN (o 0)."""
+    out = np.empty(len(values), dtype=dtype)
+    missing = 0 if np.issubdtype(out.dtype, np.integer) else np.nan
+    for i, value in enumerate(values):
+        try:
+            out[i] = value
+        except ValueError:
+            out[i] = missing
+    return out
+
+
+class CategoricalColumn:
+    """Columna de texto como códigos enteros más la lista de valores."""
+
+    def __init__(self, values, normalize=None):
+        self.normalize = normalize
+        keys = [self.key(value) for value in values]
+        self.labels, codes = np.unique(np.array(keys, dtype=object), return_inverse=True)
+        self.codes = codes.astype(np.int32)
+
+    def __len__(self):
+        return len(self.codes)
+
+    def key(self, value):
+        """Valor tal como se guarda en labels (normalizado si la columna lo pide)."""
+        return self.normalize(value) if self.normalize else value
+
+    def code_for(self, label):
+        """Código de un valor (-1 si no aparece en el export)."""
+        label = self.key(label)
+        index = np.searchsorted(self.labels, label)
+        if index < len(self.labels) and self.labels[index] == label:
+            return int(index)
+        return -1
+
+    def mask(self, labels):
+        """Filas cuyo valor está en labels."""
+        codes = [self.code_for(label) for label in labels]
+        return np.isin(self.codes, [code for code in codes if code >= 0])
+
+
+def _slice_key(filters):
+    """Clave estable de una rebanada: ((columna, (valores...)), ...)."""
+    key = []
+    for column, value in sorted(filters.items()):
+        if value is None:
+            continue
+        if column not in SLICE_COLUMNS:
+            raise ValueError(f"No se puede rebanar por {column!r}; usa {', '.join(SLICE_COLUMNS)}")
+        values = (value,) if isinstance(value, str) else tuple(sorted(value))
+        key.append((column, values))
+    return tuple(key)
+
+
+class RevisionInventory:
+    """Columnas tipadas del export de revisión con agregados en caché."""
+
+    def __init__(self, source, rows):
+        _require_numpy()
+        self.source = source
+        self.codigo = np.array([row['codigo_producto'].strip() for row in rows], dtype=object)
+        self.modelo = np.array([row['modelo'].strip() for row in rows], dtype=object)
+        self.cantidad = _numbers([row['cantidad_bodega'] for row in rows], np.int32)
+        self.precio_online = _numbers([row['precio_online'] for row in rows], np.float64)
+        self.precio_sugerido = _numbers([row['precio_sugerido_original'] for row in rows], np.float64)
+        self.peso_kg = _numbers([row['peso_kg'] for row in rows], np.float64)
+        self.num_fotos = _numbers([row['num_fotos'] for row in rows], np.int16)
+        self.fecha_valuacion = np.array(
+            [_parse_date(row['fecha_valuacion']) for row in rows], dtype='datetime64[D]')
+        self.fecha_publicacion = np.array(
+            [_parse_date(row['fecha_publicacion']) for row in rows], dtype='datetime64[D]')
+
+        self.columns = {}
+        for column in CATEGORICAL_COLUMNS:
+            # 'bueno' y 'Bueno' son la misma condición
+            normalize = str.casefold if column == 'condicion' else None
+            self.columns[column] = CategoricalColumn(
+                [row[column].strip() for row in rows], normalize)
+
+        self._masks = {}
+        self._aggregates = {}
+
+    def __len__(self):
+        return len(self.codigo)
+
+    def labels(self, column):
+        """Valores distintos de una columna categórica, ordenados."""
+        return list(self.columns[column].labels)
+
+    def mask(self, **filters):
+        """Filas de una rebanada, p. ej. mask(categoria='A jugar', estado='DISPONIBLE').
+
+        Cada filtro acepta un valor o una lista de valores; se combinan con AND.
+        """
+        key = _slice_key(filters)
+        if key not in self._masks:
+            selected = np.ones(len(self), dtype=bool)
+            for column, values in key:
+                selected &= self.columns[column].mask(values)
+            self._masks[key] = selected
+        return self._masks[key]
+
+    def _cached(self, name, filters, compute, *args):
+        """Calcula un agregado una sola vez por (agregado, rebanada, parámetros)."""
+        key = (name, _slice_key(filters), args)
+        if key not in self._aggregates:
+            self._aggregates[key] = compute(self.mask(**filters), *args)
+        return self._aggregates[key]
+
+    # ---------- Agregados ----------
+
+    def stock_by_subcategory(self, **filters):
+        """[(subcategoría, productos, unidades)] de más a menos unidades."""
+        return self._cached('stock', filters, self._stock_by_subcategory)
+
+    def _stock_by_subcategory(self, selected):
+        column = self.columns['subcategoria']
+        codes = column.codes[selected]
+        size = len(column.labels)
+        products = np.bincount(codes, minlength=size)
+        units = np.bincount(codes, weights=self.cantidad[selected], minlength=size).astype(np.int64)
+        order = np.lexsort((column.labels, -products, -units))
+        return [(column.labels[i], int(products[i]), int(units[i])) for i in order if products[i]]
+
+    def price_deltas(self, **filters):
+        """precio_online - precio_sugerido_original de la rebanada.
+
+        Regresa un dict con el número de productos comparables, cuántos
+        están por encima, por debajo o igual al sugerido, y la diferencia
+        media/mediana/mínima/máxima en pesos y en porcentaje.
+        """
+        return self._cached('prices', filters, self._price_deltas)
+
+    def _price_deltas(self, selected):
+        online = self.precio_online[selected]
+        suggested = self.precio_sugerido[selected]
+        comparable = ~np.isnan(online) & ~np.isnan(suggested) & (suggested > 0)
+        online, suggested = online[comparable], suggested[comparable]
+        delta = np.round(online - suggested, 2)
+        summary = {
+            'productos': int(comparable.size),
+            'comparables': int(delta.size),
+            'arriba': int((delta > 0).sum()),
+            'abajo': int((delta < 0).sum()),
+            'igual': int((delta == 0).sum()),
+        }
+        if delta.size:
+            percent = 100 * delta / suggested
+            summary.update({
+                'delta_media': float(delta.mean()),
+                'delta_mediana': float(np.median(delta)),
+                'delta_min': float(delta.min()),
+                'delta_max': float(delta.max()),
+                'pct_media': float(percent.mean()),
+                'pct_mediana': float(np.median(percent)),
+                'total_online': float(online.sum()),
+                'total_sugerido': float(suggested.sum()),
+            })
+        return summary
+
+    def price_outliers(self, limit=10, **filters):
+        """[(código, online, sugerido, delta)] con la mayor diferencia absoluta."""
+        return self._cached('price_outliers', filters, self._price_outliers, limit)
+
+    def _price_outliers(self, selected, limit):
+        delta = self.precio_online - self.precio_sugerido
+        candidates = np.flatnonzero(selected & ~np.isnan(delta) & (delta != 0))
+        order = candidates[np.argsort(-np.abs(delta[candidates]), kind='stable')][:limit]
+        return [(self.codigo[i], float(self.precio_online[i]), float(self.precio_sugerido[i]),
+                 float(round(delta[i], 2))) for i in order]
+
+    def days_to_publication(self, as_of=None, **filters):
+        """Días entre valuación y publicación.
+
+        Los productos sin fecha_publicacion cuentan como pendientes; para
+        ellos se reporta cuántos días llevan valuados al día as_of
+        ('YYYY-MM-DD', por defecto hoy).
+        """
+        as_of = np.datetime64(as_of or 'today', 'D')
+        return self._cached('days', filters, self._days_to_publication, as_of)
+
+    def _days_to_publication(self, selected, as_of):
+        valued = self.fecha_valuacion[selected]
+        published = self.fecha_publicacion[selected]
+        has_valuation = ~np.isnat(valued)
+        done = has_valuation & ~np.isnat(published)
+        pending = has_valuation & np.isnat(published)
+        days = (published[done] - valued[done]).astype(np.int64)
+
+        summary = {
+            'productos': int(selected.sum()),
+            'publicados': int(done.sum()),
+            'pendientes': int(pending.sum()),
+            'sin_valuacion': int((~has_valuation).sum()),
+        }
+        if days.size:
+            summary.update({
+                'dias_media': float(days.mean()),
+                'dias_mediana': float(np.median(days)),
+                'dias_max': int(days.max()),
+                'mismo_dia': int((days == 0).sum()),
+                'fecha_negativa': int((days < 0).sum()),
+            })
+        # Los valuados después de as_of todavía no cuentan como espera
+        waiting = (as_of - valued[pending]).astype(np.int64)
+        waiting = waiting[waiting >= 0]
+        if waiting.size:
+            summary.update({
+                'espera_al': str(as_of),
+                'espera_media': float(waiting.mean()),
+                'espera_max': int(waiting.max()),
+            })
+        return summary
+
+    def missing_photos(self, min_fotos=MIN_FOTOS, **filters):
+        """[(código, subcategoría, fotos)] con menos de min_fotos, de menos a más fotos."""
+        return self._cached('photos', filters, self._missing_photos, min_fotos)
+
+    def _missing_photos(self, selected, min_fotos):
+        rows = np.flatnonzero(selected & (self.num_fotos < min_fotos))
+        rows = rows[np.lexsort((self.codigo[rows], self.num_fotos[rows]))]
+        subcategories = self.columns['subcategoria']
+        return [(self.codigo[i], subcategories.labels[subcategories.codes[i]], int(self.num_fotos[i]))
+                for i in rows]
+
+    def photo_histogram(self, **filters):
+        """{número de fotos: productos} de la rebanada."""
+        return self._cached('photo_histogram', filters, self._photo_histogram)
+
+    def _photo_histogram(self, selected):
+        counts = np.bincount(self.num_fotos[selected].astype(np.int64))
+        return {photos: int(count) for photos, count in enumerate(counts) if count}
+
+
+def build_revision(csv_path=DEFAULT_CSV):
+    """Lee el CSV una vez y construye las columnas."""
+    _require_numpy()
+    with open(csv_path, 'r', encoding='utf-8-sig', newline='') as f:
+        rows = list(csv.DictReader(f))
+    return RevisionInventory(os.path.basename(csv_path), rows)
+
+
+_loaded = {}
+
+
+def load_revision(csv_path=DEFAULT_CSV):
+    """Inventario de un CSV; se lee una sola vez por proceso."""
+    path = os.path.abspath(csv_path)
+    if path not in _loaded:
+        _loaded[path] = build_revision(path)
+    return _loaded[path]
+
+
+# ---------- Reportes ----------
+
+def _money(value):
+    return f'${value:,.2f}'
+
+
+def print_report(inventory, min_fotos=MIN_FOTOS, top=15, as_of=None, **filters):
+    """Reporte de una rebanada del inventario."""
+    selected = inventory.mask(**filters)
+    title = ', '.join(f"{column}={value if isinstance(value, str) else ' | '.join(value)}"
+                      for column, value in filters.items() if value) or 'todo el inventario'
+
+    print('=' * 70)
+    print(f'📦 REVISIÓN DE INVENTARIO ONLINE: {title}')
+    print('=' * 70)
+    print(f'Productos: {int(selected.sum())} de {len(inventory)} '
+          f'({int(inventory.cantidad[selected].sum())} unidades en bodega)')
+
+    stock = inventory.stock_by_subcategory(**filters)
+    print(f'\n📁 Existencias por subcategoría ({len(stock)} subcategorías)')
+    for subcategory, products, units in stock[:top]:
+        print(f'   {units:5} u  {products:4} prod  {subcategory}')
+    if len(stock) > top:
+        rest = stock[top:]
+        print(f'   {sum(u for _, _, u in rest):5} u  {sum(p for _, p, _ in rest):4} prod  '
+              f'(otras {len(rest)} subcategorías)')
+
+    prices = inventory.price_deltas(**filters)
+    print('\n💲 Precio online vs sugerido original')
+    if prices['comparables']:
+        print(f"   Comparables: {prices['comparables']} "
+              f"(arriba {prices['arriba']}, abajo {prices['abajo']}, igual {prices['igual']})")
+        print(f"   Diferencia media {_money(prices['delta_media'])} ({prices['pct_media']:+.1f}%), "
+              f"mediana {_money(prices['delta_mediana'])} ({prices['pct_mediana']:+.1f}%)")
+        print(f"   Rango {_money(prices['delta_min'])} a {_money(prices['delta_max'])}; "
+              f"total online {_money(prices['total_online'])} vs sugerido {_money(prices['total_sugerido'])}")
+        for code, online, suggested, delta in inventory.price_outliers(5, **filters):
+            print(f'      {code:10} {_money(online):>10} vs {_money(suggested):>10} ({delta:+,.2f})')
+    else:
+        print('   Sin productos con ambos precios')
+
+    days = inventory.days_to_publication(as_of, **filters)
+    print('\n📅 Días de valuación a publicación')
+    print(f"   Publicados: {days['publicados']}, pendientes: {days['pendientes']}, "
+          f"sin valuación: {days['sin_valuacion']}")
+    if days['publicados']:
+        print(f"   Media {days['dias_media']:.1f} días, mediana {days['dias_mediana']:.0f}, "
+              f"máximo {days['dias_max']}; mismo día: {days['mismo_dia']}")
+        if days['fecha_negativa']:
+            print(f"   ⚠️  {days['fecha_negativa']} publicados antes de su valuación")
+    if 'espera_media' in days:
+        print(f"   Pendientes llevan en promedio {days['espera_media']:.1f} días valuados "
+              f"al {days['espera_al']} (máximo {days['espera_max']})")
+
+    missing = inventory.missing_photos(min_fotos, **filters)
+    histogram = ', '.join(f'{photos}: {count}' for photos, count in inventory.photo_histogram(**filters).items())
+    print(f'\n📷 Fotos por producto ({histogram})')
+    print(f'   Con menos de {min_fotos} fotos: {len(missing)}')
+    for code, subcategory, photos in missing[:top]:
+        print(f'      {code:10} {photos} foto(s)  {subcategory}')
+    if len(missing) > top:
+        print(f'      ... y {len(missing) - top} más')
+    print()
+
+
+def _as_of_date(value):
+    """Valida --as-of: 'YYYY-MM-DD' o dd/mm/aaaa como en el export."""
+    try:
+        return str(np.datetime64(_parse_date(value) if '/' in value else value, 'D'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"fecha inválida: {value!r}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Análisis de revision_inventario_online_completo.csv")
+    parser.add_argument('--csv', default=DEFAULT_CSV, help="ruta del export de revisión")
+    for column in SLICE_COLUMNS:
+        parser.add_argument(f'--{column}', action='append',
+                            help=f"filtrar por {column} (se puede repetir)")
+    parser.add_argument('--por-categoria', action='store_true',
+                        help="un reporte por cada categoría (además de los filtros)")
+    parser.add_argument('--min-fotos', type=int, default=MIN_FOTOS,
+                        help="fotos esperadas por producto (default %(default)s)")
+    parser.add_argument('--top', type=int, default=15, help="filas por lista (default %(default)s)")
+    parser.add_argument('--as-of', type=_as_of_date, default=None,
+                        help="fecha (YYYY-MM-DD) para medir la espera de los pendientes (default hoy)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    inventory = load_revision(args.csv)
+    filters = {column: getattr(args, column) for column in SLICE_COLUMNS}
+
+    if args.por_categoria:
+        for category in filters['categoria'] or inventory.labels('categoria'):
+            print_report(inventory, args.min_fotos, args.top, args.as_of, **dict(filters, categoria=category))
+    else:
+        print_report(inventory, args.min_fotos, args.top, args.as_of, **filters)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+"""
+Registro de subcategorías: nombre <-> id <-> prefijo de SKU.
+
+Reemplaza los diccionarios escritos a mano en los scripts de migración.
+El registro se construye desde una fuente enchufable:
+- 'csv': data/subcategories.csv (export de la tabla subcategories)
+- 'db':  tablas categories/subcategories, vía db_session
+y se guarda en un caché binario con un sello de versión, así que las
+corridas repetidas no vuelven a leer la fuente mientras no cambie.
+
+Los nombres se comparan sin acentos, mayúsculas ni espacios repetidos
+('Colechos y moises' == 'Colechos y Moisés'). Algunos nombres se repiten
+entre categorías ('Montables de exterior' es 5 en A pasear y 54 en A Jugar),
+por eso conviene pasar la categoría al buscar.
+
+Para nombres mal codificados del export ('Accesorios Rec?mara') resolve()
+usa un índice difuso: candidatos por trigramas y distancia de edición donde
+'?' vale por cualquier carácter, con un puntaje de confianza entre 0 y 1.
+Sólo los nombres con '?' pasan por el índice difuso (o con fuzzy=True); un
+nombre nuevo o mal escrito sin '?' no se reasigna a otra subcategoría.
+
+Uso:
+    from subcategory_registry import load_registry
+    registry = load_registry()
+    registry.id_for('Juguetes', 'A Jugar')   # 46
+    registry.sku_prefix(46)                  # 'JUGP'
+    registry.resolve('Colechos y Mois?s')    # (11, 0.985)
+    registry.resolve('Colechos y Moisés 2')  # (None, 0.0): sin '?' no hay difuso
+"""
+
+import csv
+import hashlib
+import math
+import os
+import pickle
+import unicodedata
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CSV = os.path.join(SCRIPTS_DIR, '..', 'data', 'subcategories.csv')
+CACHE_SUFFIX = '.registry.pickle'
+DB_CACHE = os.path.join(SCRIPTS_DIR, 'subcategories-db' + CACHE_SUFFIX)
+CACHE_VERSION = 3
+
+UNKNOWN_SKU_PREFIX = 'UNKN'
+
+# Nombres de categoría de la tienda anterior y de la base (id en categories).
+# El export de subcategories sólo trae category_id, así que los nombres viven aquí.
+CATEGORY_ALIASES = {
+    'A pasear': 1,
+    'A dormir': 2,
+    'En casa': 3,
+    'Baño': 3,  # Baño se mapea a "En Casa"
+    'A comer': 4,
+    'Ropa': 5,
+    'A Jugar': 6,
+}
+
+
+# Confianza mínima para aceptar un nombre difuso
+MIN_CONFIDENCE = 0.8
+# Costo de que un '?' (carácter perdido en la codificación) cubra una letra
+WILDCARD = '?'
+WILDCARD_COST = 0.25
+# Fracción de los trigramas del nombre que debe compartir un candidato
+# antes de calcular su distancia de edición
+MIN_TRIGRAM_OVERLAP = 0.5
+
+
+def normalize_name(name):
+    """Clave de comparación: sin acentos, en minúsculas y con espacios simples."""
+    decomposed = unicodedata.normalize('NFKD', name or '')
+    stripped = ''.join(c for c in decomposed if not unicodedata.combining(c))
+    return ' '.join(stripped.casefold().split())
+
+
+def trigrams(key):
+    """Trigramas de una clave normalizada, sin los que tocan un '?'."""
+    padded = f'  {key} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2) if WILDCARD not in padded[i:i + 3]}
+
+
+def wildcard_distance(query, candidate):
+    """Distancia de edición donde cada '?' de query cubre un carácter de candidate."""
+    previous = [float(j) for j in range(len(candidate) + 1)]
+    for i, q in enumerate(query, 1):
+        current = [float(i)]
+        for j, c in enumerate(candidate, 1):
+            if q == c:
+                substitution = 0.0
+            elif q == WILDCARD:
+                substitution = WILDCARD_COST
+            else:
+                substitution = 1.0
+            current.append(min(previous[j] + 1, current[j - 1] + 1,
+                               previous[j - 1] + substitution))
+        previous = current
+    return previous[-1]
+
+
+class FuzzyNameIndex:
+    """Resuelve nombres de subcategoría aproximados contra los nombres conocidos.
+
+    Se construye una vez por registro (y viaja en su caché); las respuestas
+    se memorizan porque el export repite los mismos nombres rotos.
+    """
+
+    def __init__(self, subcategories):
+        self.names = {}
+        self.by_trigram = {}
+        for sub in subcategories:
+            key = normalize_name(sub['name'])
+            self.names.setdefault(key, []).append(sub)
+            for gram in trigrams(key):
+                self.by_trigram.setdefault(gram, set()).add(key)
+        self.memo = {}
+
+    def candidates(self, key):
+        """Nombres que comparten al menos MIN_TRIGRAM_OVERLAP de los trigramas de key."""
+        grams = trigrams(key)
+        shared = {}
+        for gram in grams:
+            for candidate in self.by_trigram.get(gram, ()):
+                shared[candidate] = shared.get(candidate, 0) + 1
+        needed = max(1, math.ceil(MIN_TRIGRAM_OVERLAP * len(grams)))
+        return {candidate for candidate, count in shared.items() if count >= needed}
+
+    def match(self, name):
+        """Regresa [(confianza, clave)] ordenado de mejor a peor."""
+        key = normalize_name(name)
+        if key in self.memo:
+            return self.memo[key]
+
+        if key in self.names:
+            ranked = [(1.0, key)]
+        else:
+            ranked = []
+            for candidate in self.candidates(key):
+                distance = wildcard_distance(key, candidate)
+                confidence = 1 - distance / max(len(key), len(candidate))
+                ranked.append((round(confidence, 3), candidate))
+            ranked.sort(key=lambda item: (-item[0], item[1]))
+
+        self.memo[key] = ranked
+        return ranked
+
+
+class SubcategoryRegistry:
+    """Índices en memoria sobre las subcategorías; todas las búsquedas son O(1)."""
+
+    def __init__(self, source, subcategories, categories=None):
+        self.source = source
+        self.subcategories = sorted(subcategories, key=lambda sub: sub['id'])
+        self.version = hashlib.sha1(repr(
+            [(s['id'], s['category_id'], s['name'], s['sku']) for s in self.subcategories]
+        ).encode('utf-8')).hexdigest()[:12]
+
+        self.categories = {}
+        for name, category_id in list(CATEGORY_ALIASES.items()) + list((categories or {}).items()):
+            self.categories[normalize_name(name)] = category_id
+
+        self.by_id = {}
+        self.by_name = {}
+        self.by_category_name = {}
+        self.by_sku_prefix = {}
+        for sub in self.subcategories:
+            key = normalize_name(sub['name'])
+            self.by_id[sub['id']] = sub
+            # Nombre repetido entre categorías: sin categoría gana el id menor
+            self.by_name.setdefault(key, sub['id'])
+            self.by_category_name[(sub['category_id'], key)] = sub['id']
+            self.by_sku_prefix.setdefault(sub['sku'], []).append(sub['id'])
+
+        self.fuzzy = FuzzyNameIndex(self.subcategories)
+
+    def __len__(self):
+        return len(self.subcategories)
+
+    def __contains__(self, subcategory_id):
+        return subcategory_id in self.by_id
+
+    def category_id_for(self, category):
+        """Id de una categoría a partir de su id o nombre."""
+        if isinstance(category, int):
+            return category
+        return self.categories.get(normalize_name(category))
+
+    def id_for(self, name, category=None):
+        """Id de una subcategoría por nombre (y categoría, si se conoce)."""
+        key = normalize_name(name)
+        if category is not None:
+            category_id = self.category_id_for(category)
+            subcategory_id = self.by_category_name.get((category_id, key))
+            if subcategory_id is not None:
+                return subcategory_id
+        return self.by_name.get(key)
+
+    def resolve(self, name, category=None, min_confidence=MIN_CONFIDENCE, fuzzy=False):
+        """Id y confianza de un nombre exacto, sin acentos o mal codificado.
+
+        El índice difuso sólo se usa si el nombre trae '?' (caracteres
+        perdidos en la codificación) o con fuzzy=True; cualquier otro nombre
+        desconocido regresa (None, 0.0) para que quien llama lo reporte.
+        Con categoría se prefieren los nombres de esa categoría. Si ningún
+        candidato llega a min_confidence, o dos nombres empatan, regresa
+        (None, mejor confianza).
+        """
+        subcategory_id = self.id_for(name, category)
+        if subcategory_id is not None:
+            return subcategory_id, 1.0
+        if not fuzzy and WILDCARD not in (name or ''):
+            return None, 0.0
+
+        ranked = self.fuzzy.match(name)
+        if not ranked:
+            return None, 0.0
+        confidence, key = ranked[0]
+        # Empate entre dos nombres distintos: no hay forma de elegir
+        if confidence < min_confidence or (len(ranked) > 1 and ranked[1][0] == confidence):
+            return None, confidence
+
+        category_id = self.category_id_for(category) if category is not None else None
+        subs = self.fuzzy.names[key]
+        in_category = [sub for sub in subs if sub['category_id'] == category_id]
+        return (in_category or subs)[0]['id'], confidence
+
+    def name_for(self, subcategory_id):
+        sub = self.by_id.get(subcategory_id)
+        return sub['name'] if sub else None
+
+    def category_of(self, subcategory_id):
+        sub = self.by_id.get(subcategory_id)
+        return sub['category_id'] if sub else None
+
+    def sku_prefix(self, subcategory_id):
+        sub = self.by_id.get(subcategory_id)
+        return sub['sku'] if sub else UNKNOWN_SKU_PREFIX
+
+    def ids_for_prefix(self, prefix):
+        """Subcategorías que comparten un prefijo de SKU."""
+        return self.by_sku_prefix.get(prefix, [])
+
+
+def _stamp_file(path=None):
+    stat = os.stat(path or DEFAULT_CSV)
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def read_csv_source(path=None):
+    """Subcategorías del export CSV de la tabla subcategories."""
+    subcategories = []
+    with open(path or DEFAULT_CSV, 'r', encoding='utf-8-sig', newline='') as f:
+        for row in csv.DictReader(f):
+            subcategories.append({
+                'id': int(row['id']),
+                'category_id': int(row['category_id']),
+                'name': row['name'].strip(),
+                'sku': row['sku'].strip(),
+            })
+    return subcategories, {}
+
+
+SUBCATEGORIES_SQL = "SELECT id, category_id, name, sku FROM subcategories ORDER BY id"
+CATEGORIES_SQL = "SELECT id, name FROM categories"
+DB_STAMP_SQL = "SELECT COUNT(*), MAX(updated_at)::text FROM subcategories"
+
+
+def read_db_source(dsn=None):
+    """Subcategorías y categorías directamente de la base."""
+    import db_session
+
+    conn = db_session.get_connection(dsn)
+    try:
+        cur = conn.cursor()
+        cur.execute(SUBCATEGORIES_SQL)
+        subcategories = [
+            {'id': sub_id, 'category_id': category_id, 'name': name.strip(), 'sku': sku.strip()}
+            for sub_id, category_id, name, sku in cur
+        ]
+        cur.execute(CATEGORIES_SQL)
+        categories = {name: category_id for category_id, name in cur}
+        cur.close()
+    finally:
+        db_session.release_connection(conn)
+    return subcategories, categories
+
+
+def _db_stamp(dsn=None):
+    import db_session
+
+    conn = db_session.get_connection(dsn)
+    try:
+        cur = conn.cursor()
+        cur.execute(DB_STAMP_SQL)
+        stamp = cur.fetchone()
+        cur.close()
+    finally:
+        db_session.release_connection(conn)
+    return stamp
+
+
+# Fuentes enchufables: nombre -> (lector, sello, ruta del caché)
+SOURCES = {
+    'csv': (read_csv_source, _stamp_file, lambda location: (location or DEFAULT_CSV) + CACHE_SUFFIX),
+    'db': (read_db_source, _db_stamp, lambda location: DB_CACHE),
+}
+
+
+def register_source(name, reader, stamp, cache_path):
+    """Agrega otra fuente de subcategorías (p. ej. un JSON de la API)."""
+    SOURCES[name] = (reader, stamp, cache_path)
+
+
+def build_registry(source='csv', location=None):
+    """Construye el registro leyendo la fuente, sin usar el caché."""
+    reader = SOURCES[source][0]
+    subcategories, categories = reader(location)
+    return SubcategoryRegistry(source, subcategories, categories)
+
+
+def load_registry(source='csv', location=None, use_cache=True):
+    """Carga el registro desde el caché o lo reconstruye si la fuente cambió.
+
+    location es la ruta del CSV para 'csv' o el DSN para 'db'.
+    """
+    if not use_cache:
+        return build_registry(source, location)
+
+    reader, stamp_fn, cache_path_fn = SOURCES[source]
+    stamp = stamp_fn(location)
+    cache_path = cache_path_fn(location)
+
+    try:
+        with open(cache_path, 'rb') as f:
+            cache = pickle.load(f)
+        if cache.get('version') == CACHE_VERSION and cache.get('stamp') == stamp:
+            return cache['registry']
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, KeyError):
+        pass
+
+    registry = build_registry(source, location)
+    tmp_path = cache_path + '.tmp'
+    try:
+        with open(tmp_path, 'wb') as f:
+            pickle.dump({'version': CACHE_VERSION, 'stamp': stamp, 'registry': registry},
+                        f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        # Sin caché el registro sigue sirviendo; sólo se pierde la aceleración
+        print(f"⚠️  No se pudo guardar el caché de subcategorías: {e}")
+    return registry
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Pruebas de fix-misclassified-products.py.
+
+    python -m unittest scripts/test_fix_misclassified_products.py
+
+Las pruebas contra PostgreSQL sólo corren si TEST_DATABASE_URL apunta a una
+base local (p. ej. la de docker-compose); crean tablas temporales que tapan
+valuation_items e inventario y terminan en ROLLBACK, así que no tocan datos.
+"""
+
+import importlib.util
+import os
+import sys
+import unittest
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, SCRIPTS_DIR)
+
+try:
+    import psycopg2
+except ImportError:  # pragma: no cover - dependencia opcional
+    psycopg2 = None
+
+
+def load_script():
+    """El script lleva guiones en el nombre: se importa por ruta."""
+    path = os.path.join(SCRIPTS_DIR, 'fix-misclassified-products.py')
+    spec = importlib.util.spec_from_file_location('fix_misclassified_products', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+fix = load_script() if psycopg2 else None
+
+TEST_DSN = os.environ.get('TEST_DATABASE_URL')
+
+# Mismas columnas que usan los UPDATE; temporales, así tapan a las reales
+CREATE_FAKE_TABLES_SQL = """
+    CREATE TEMP TABLE valuation_items (
+        id INTEGER PRIMARY KEY,
+        subcategory_id INTEGER,
+        category_id INTEGER
+    );
+    CREATE TEMP TABLE inventario (
+        id TEXT PRIMARY KEY,
+        valuation_item_id INTEGER
+    );
+    INSERT INTO valuation_items VALUES (10, 1, 1), (11, 2, 1);
+    -- Dos filas de inventario del mismo valuation_item (valuation_item_id no es único)
+    INSERT INTO inventario VALUES ('AUTP001', 10), ('AUTP002', 10), ('CAPP001', 11);
+"""
+
+
+def product(vi_id, inventory_id, correct_sub_id=46, correct_cat_id=6):
+    return fix.MisclassifiedProduct(vi_id, 'OLD' + str(vi_id), inventory_id, 1, 1,
+                                    correct_sub_id, correct_cat_id, 'Juguetes', 'Producto')
+
+
+@unittest.skipIf(fix is None, "requiere psycopg2")
+class SubcategoryCorrectionsTest(unittest.TestCase):
+
+    def test_duplicate_vi_rows_become_one_correction(self):
+        misclassified = [product(10, 'AUTP001'), product(10, 'AUTP002'), product(11, 'CAPP001')]
+        self.assertEqual(fix.subcategory_corrections(misclassified),
+                         [(10, 46, 6), (11, 46, 6)])
+
+    def test_expected_counts_use_distinct_valuation_items(self):
+        misclassified = [product(10, 'AUTP001'), product(10, 'AUTP002')]
+        sku_changes = [{'old': 'AUTP001', 'new': 'JUGP001'}, {'old': 'AUTP002', 'new': 'JUGP002'}]
+        self.assertEqual(fix.expected_counts(misclassified, sku_changes),
+                         {'valuation_items': 1, 'inventario': 2})
+
+
+@unittest.skipIf(fix is None or not TEST_DSN, "requiere psycopg2 y TEST_DATABASE_URL")
+class ApplyCorrectionsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.conn = psycopg2.connect(TEST_DSN)
+        with self.conn.cursor() as cur:
+            cur.execute(CREATE_FAKE_TABLES_SQL)
+
+    def tearDown(self):
+        self.conn.rollback()
+        self.conn.close()
+
+    def test_duplicate_vi_row_does_not_abort_the_run(self):
+        misclassified = [product(10, 'AUTP001'), product(10, 'AUTP002'), product(11, 'CAPP001')]
+        sku_changes = [
+            {'old': 'AUTP001', 'new': 'JUGP001'},
+            {'old': 'AUTP002', 'new': 'JUGP002'},
+            {'old': 'CAPP001', 'new': 'JUGP003'},
+        ]
+        counts = fix.apply_corrections(self.conn, misclassified, sku_changes, commit=False)
+        self.assertEqual(counts, {'valuation_items': 2, 'inventario': 3})
+        self.assertEqual(counts, fix.expected_counts(misclassified, sku_changes))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""Tests for icon_library: python -m unittest test_icon_library"""
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+import icon_library
+from icon_library import IconLibrary
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SELECTION_FILE = os.path.join(HERE, icon_library.SELECTION_FILE)
+FONT_FILE = os.path.join(HERE, icon_library.FONT_FILE)
+
+
+class FontFallbackTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp)
+        self.font = IconLibrary('font', FONT_FILE)
+
+    def selection_without(self, name):
+        """Copy of selection.json without the icon called name."""
+        with open(SELECTION_FILE, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        before = len(data['icons'])
+        data['icons'] = [icon for icon in data['icons'] if icon['properties']['name'] != name]
+        self.assertEqual(len(data['icons']), before - 1)
+        path = os.path.join(self.tmp, 'selection.json')
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        return path
+
+    def test_icon_missing_from_selection_comes_from_font(self):
+        selection = IconLibrary('selection', self.selection_without('juguetes'), fallback=self.font)
+        self.assertIsNone(selection.get('toys'))
+        self.assertEqual(selection.get_icon('toys', 48), self.font.get_icon('toys', 48))
+        # Icons still in selection.json are not taken from the font
+        self.assertEqual(selection.get_icon('cribs'), selection.get('cribs').svg())
+
+    def test_missing_selection_file_uses_font(self):
+        selection = IconLibrary('selection', os.path.join(self.tmp, 'missing.json'), fallback=self.font)
+        self.assertEqual(selection.get_icon('toys'), self.font.get_icon('toys'))
+        self.assertEqual(selection.get_icon(0xe900), self.font.get_icon(0xe900))
+
+    def test_without_fallback_missing_icon_raises(self):
+        selection = IconLibrary('selection', self.selection_without('juguetes'))
+        with self.assertRaises(KeyError):
+            selection.get_icon('toys')
+        with self.assertRaises(FileNotFoundError):
+            IconLibrary('selection', os.path.join(self.tmp, 'missing.json')).get_icon('toys')
+
+    def test_shared_selection_library_falls_back_to_font(self):
+        self.assertIs(icon_library.library('selection').fallback, icon_library.library('font'))
+        self.assertIsNone(icon_library.library('font').fallback)
+
+
+if __name__ == '__main__':
+    unittest.main()